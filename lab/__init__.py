@@ -0,0 +1,3 @@
+"""
+Support code for the Virtual Science Lab app.
+"""
@@ -0,0 +1,241 @@
+"""
+Decoded experiment images, shared across sessions and server processes.
+
+Simulations read step images as pixel arrays. Decoding a large PNG on
+every rerun would cost each session the same work, so the first decode is
+written to a pixel store on disk and mapped read-only from then on, and an
+in-process cache keeps the maps of recently used assets.
+"""
+import hashlib
+import io
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from lab.files import atomic_write, file_signature
+
+# NumPy and Pillow are imported on first use, so starting the app does not
+# wait for them.
+if TYPE_CHECKING:
+    import numpy as np
+
+try:
+    import fcntl
+except ImportError:
+    # Windows: no cross-process lock, so replicas may decode in parallel.
+    fcntl = None
+
+# Total pixel bytes the cache may keep mapped before dropping the least
+# recently used asset. Can be tuned per deployment without touching the code.
+DEFAULT_MAX_BYTES = int(os.environ.get("LAB_ASSET_CACHE_MB", "256")) * 1024 * 1024
+
+# Decoded images, shared by every server process that can see this folder.
+DEFAULT_STORE_DIR = os.environ.get("LAB_PIXEL_STORE", "data/pixels")
+
+
+class PixelStore:
+    """
+    Decoded images on disk, one .npy file per source file, named by a hash
+    of its path and a hash of its bytes.
+
+    The first process to need an image decodes and writes it; every process
+    then maps the file read-only. Mapped pages live once in the OS page
+    cache, so running more server replicas does not add a decoded copy of
+    each asset per process. Writing a source's new pixels deletes the files
+    of its earlier versions.
+    """
+
+    def __init__(self, path: str | Path = DEFAULT_STORE_DIR):
+        self.path = Path(path)
+
+    def load(self, source: str | Path, raw: bytes) -> "np.ndarray | None":
+        """
+        Read-only (height, width, channels) pixels for `raw`, the encoded
+        bytes of the image at `source`, or None if they cannot be decoded.
+        Only the first frame of a GIF is kept.
+        """
+        asset = hashlib.sha256(str(source).encode()).hexdigest()[:16]
+        digest = hashlib.sha256(raw).hexdigest()[:32]
+        target = self.path / f"{asset}.{digest}.npy"
+        if not target.exists():
+            self.path.mkdir(parents=True, exist_ok=True)
+            # Replicas starting together wait for one of them to decode,
+            # rather than all decoding the same image at once.
+            with open(self.path / f".{asset}.{digest}.lock", "w") as lock:
+                if fcntl is not None:
+                    fcntl.flock(lock, fcntl.LOCK_EX)
+                if not target.exists():
+                    if not self._write(raw, target):
+                        return None
+                    self._remove_older(asset, digest)
+        import numpy as np
+
+        return np.load(target, mmap_mode="r")
+
+    def _write(self, raw: bytes, target: Path) -> bool:
+        import numpy as np
+        from PIL import Image
+
+        try:
+            img = Image.open(io.BytesIO(raw))
+            img.load()
+        except OSError:
+            return False
+        has_alpha = img.mode in ("RGBA", "LA", "PA") or "transparency" in img.info
+        buffer = io.BytesIO()
+        np.save(buffer, np.asarray(img.convert("RGBA" if has_alpha else "RGB")))
+        atomic_write(target, buffer.getvalue())
+        return True
+
+    def _remove_older(self, asset: str, digest: str):
+        # Processes still mapping an old file keep their pages until they
+        # drop it; where the OS refuses to delete a mapped file, it is left
+        # for the next write of that source.
+        current = {f"{asset}.{digest}.npy", f".{asset}.{digest}.lock"}
+        for old in [*self.path.glob(f"{asset}.*.npy"), *self.path.glob(f".{asset}.*.lock")]:
+            if old.name not in current:
+                try:
+                    old.unlink()
+                except OSError:
+                    pass
+
+
+class _Entry:
+    __slots__ = ("key", "signature", "pixels", "size")
+
+    def __init__(self, key: str, signature: list[int], pixels: "np.ndarray"):
+        self.key = key
+        self.signature = signature
+        self.pixels = pixels
+        self.size = pixels.nbytes
+
+
+class AssetCache:
+    """
+    Process-wide index of decoded assets, shared by every session.
+
+    Entries are keyed by path and remember the file's mtime and size, so a
+    teacher replacing a file is picked up on the next rerun. Pixels are
+    memory maps into the pixel store rather than copies, so sessions and
+    processes all read the same pages. The cache is bounded by mapped bytes
+    and drops least recently used entries.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES, store: PixelStore | None = None):
+        self.max_bytes = max_bytes
+        self.store = store or PixelStore()
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        # Signature of every path ever looked up, kept past eviction, so a
+        # change is noticed even for assets no longer mapped.
+        self._seen: dict[str, list[int] | None] = {}
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, path: str | Path) -> "np.ndarray | None":
+        """
+        Return the read-only pixels of the image at `path`, or None if the
+        file is missing or is not an image.
+        """
+        key = str(path)
+        signature = file_signature(key)
+        with self._lock:
+            self._note(key, signature)
+        if signature is None:
+            self.invalidate(key)
+            return None
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.signature == signature:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry.pixels
+            self.misses += 1
+
+        # Read and decode outside the lock so one slow file does not block
+        # other sessions. The raw bytes are only kept long enough to hash.
+        try:
+            pixels = self.store.load(key, Path(key).read_bytes())
+        except OSError:
+            return None
+        if pixels is None:
+            return None
+        entry = _Entry(key, signature, pixels)
+
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old.size
+            if entry.size <= self.max_bytes:
+                self._entries[key] = entry
+                self._bytes += entry.size
+                self._evict()
+        return entry.pixels
+
+    def generation(self) -> int:
+        """
+        A number that goes up whenever a file looked up through the cache
+        has changed, appeared or gone since. Results computed from cached
+        pixels can be kept under it, so they are computed again after a
+        teacher replaces an image.
+        """
+        with self._lock:
+            seen = list(self._seen)
+        signatures = {key: file_signature(key) for key in seen}
+        with self._lock:
+            for key, signature in signatures.items():
+                self._note(key, signature)
+            return self._generation
+
+    def _note(self, key: str, signature: list[int] | None):
+        # Caller holds the lock.
+        if key in self._seen and self._seen[key] != signature:
+            self._generation += 1
+        self._seen[key] = signature
+
+    def invalidate(self, path: str | Path):
+        """
+        Drop a single entry, if present.
+        """
+        with self._lock:
+            old = self._entries.pop(str(path), None)
+            if old is not None:
+                self._bytes -= old.size
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict[str, int]:
+        """
+        Snapshot of the cache counters, for facilitator dashboards and logs.
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+    def _evict(self):
+        # Caller holds the lock. Dropping an entry only unmaps it here; the
+        # file stays in the store for other processes.
+        while self._bytes > self.max_bytes and self._entries:
+            _, old = self._entries.popitem(last=False)
+            self._bytes -= old.size
+            self.evictions += 1
+
+
+# Module-level instance: imported modules survive Streamlit reruns, so every
+# session in this process shares the same cache.
+ASSET_CACHE = AssetCache()
@@ -0,0 +1,108 @@
+"""
+Choosing the built variant of an asset to send to the browser.
+
+The build stage (python -m tools.build_assets) writes every image and GIF
+in several widths, formats and quality levels, listed in a manifest. The
+app picks the smallest one that fills the column at the learner's quality
+level, and falls back to the source file when no variant matches it.
+"""
+import json
+import threading
+from pathlib import Path
+
+from lab.files import file_signature
+
+# Folders teachers drop experiment assets into, and where the build stage
+# (python -m tools.build_assets) writes resized and re-encoded variants.
+SOURCE_DIRS = ("assets/images", "assets/gif")
+SOURCE_PATTERNS = ("exp0*.png", "exp0*.jpg", "exp0*.jpeg", "exp0*.gif")
+BUILD_DIR = Path("assets/build")
+MANIFEST_PATH = BUILD_DIR / "manifest.json"
+
+VARIANT_WIDTHS = (320, 480, 640, 960, 1280)
+
+# Quality levels learners or facilitators can pick in the sidebar.
+# `scale` multiplies the column width, the rest are encoder settings.
+QUALITY_LEVELS = {
+    "low": {"label": "Low data", "scale": 0.5, "webp_quality": 45, "colours": 32, "h264_crf": 34, "vp9_crf": 42},
+    "standard": {"label": "Standard", "scale": 1.0, "webp_quality": 70, "colours": 128, "h264_crf": 28, "vp9_crf": 36},
+    "high": {"label": "High", "scale": 1.5, "webp_quality": 88, "colours": 256, "h264_crf": 23, "vp9_crf": 31},
+}
+DEFAULT_QUALITY = "standard"
+
+# Variant formats shown as images. Animations may also have video clips,
+# in order of preference, each with a still "poster" of the first frame.
+IMAGE_FORMATS = ("webp", "png", "gif")
+VIDEO_FORMATS = ("webm", "mp4")
+VIDEO_TYPES = {"webm": "video/webm", "mp4": "video/mp4"}
+
+_manifest: dict = {}
+_manifest_mtime: int | None = None
+_manifest_lock = threading.Lock()
+
+
+def load_manifest() -> dict:
+    """
+    Return the variant manifest, re-reading it only when the build stage
+    has rewritten it. An empty dict means no variants have been built.
+    """
+    global _manifest, _manifest_mtime
+    try:
+        mtime = MANIFEST_PATH.stat().st_mtime_ns
+    except OSError:
+        return {}
+    with _manifest_lock:
+        if mtime != _manifest_mtime:
+            try:
+                _manifest = json.loads(MANIFEST_PATH.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                _manifest = {}
+            _manifest_mtime = mtime
+        return _manifest
+
+
+def _usable(source: str, quality: str, formats: tuple[str, ...]) -> list[dict]:
+    entry = load_manifest().get(source)
+    if entry is None:
+        return []
+    if file_signature(source) != entry["signature"]:
+        return []
+    return [v for v in entry["variants"] if v["quality"] == quality and v["format"] in formats]
+
+
+def _best_width(candidates: list[dict], column_width: int, quality: str) -> int:
+    level = QUALITY_LEVELS.get(quality, QUALITY_LEVELS[DEFAULT_QUALITY])
+    target = int(column_width * level["scale"])
+    fitting = [v["width"] for v in candidates if v["width"] >= target]
+    return min(fitting) if fitting else max(v["width"] for v in candidates)
+
+
+def pick_variant(source: str, column_width: int, quality: str = DEFAULT_QUALITY) -> dict | None:
+    """
+    Choose the smallest built image variant of `source` that fills the
+    column at the given quality level. Returns None when there is no usable
+    variant, for example before the first build or after the source file
+    changed.
+    """
+    candidates = _usable(source, quality, IMAGE_FORMATS)
+    if not candidates:
+        return None
+    width = _best_width(candidates, column_width, quality)
+    return min((v for v in candidates if v["width"] == width), key=lambda v: v["bytes"])
+
+
+def pick_video(source: str, column_width: int, quality: str = DEFAULT_QUALITY) -> dict | None:
+    """
+    The built clips of an animation that fill the column, as {"poster":
+    variant, "sources": [variants in VIDEO_FORMATS order]}, or None if it
+    has no clips (not animated, or built without ffmpeg).
+    """
+    candidates = _usable(source, quality, VIDEO_FORMATS + ("poster",))
+    if not candidates:
+        return None
+    width = _best_width(candidates, column_width, quality)
+    chosen = {v["format"]: v for v in candidates if v["width"] == width}
+    sources = [chosen[fmt] for fmt in VIDEO_FORMATS if fmt in chosen]
+    if "poster" not in chosen or not sources:
+        return None
+    return {"poster": chosen["poster"], "sources": sources}
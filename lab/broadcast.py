@@ -0,0 +1,74 @@
+"""
+Facilitator broadcast: one simulation run per classroom, not per learner.
+
+While a facilitator broadcasts, what their session shows (experiment, step,
+inputs and the simulation's result as JSON-ready blocks with frames as
+static URLs) is published to a channel named by the classroom code.
+Learner sessions following that classroom read the latest view from the
+channel and draw it as it is; they never run the simulation or decode an
+asset themselves, so the server's work grows with classrooms rather than
+learners.
+"""
+import threading
+import time
+
+# A broadcast not published to for this long counts as ended, such as when
+# the facilitator closed the tab without switching it off.
+IDLE_SECONDS = 2 * 60 * 60.0
+
+
+class Broadcast:
+    """
+    In-process channels, one per classroom, each holding the latest view.
+
+    Every published view that differs from the one before gets a new
+    version number, so followers can tell cheaply whether anything changed.
+    """
+
+    def __init__(self, idle_seconds: float = IDLE_SECONDS):
+        self.idle_seconds = idle_seconds
+        self._channels: dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self._version = 0
+
+    def publish(self, classroom: str, experiment_id: str, step_no: int, inputs: dict, blocks: list[dict]) -> int:
+        """
+        Make this the classroom's current view and return its version.
+        Publishing the view already current only keeps the channel alive.
+        """
+        view = {"experiment": experiment_id, "step": step_no, "inputs": inputs, "blocks": blocks}
+        with self._lock:
+            current = self._channels.get(classroom)
+            if current is not None and all(current[key] == value for key, value in view.items()):
+                current["at"] = time.monotonic()
+                return current["version"]
+            self._version += 1
+            self._channels[classroom] = {**view, "version": self._version, "at": time.monotonic()}
+            return self._version
+
+    def stop(self, classroom: str):
+        with self._lock:
+            self._channels.pop(classroom, None)
+
+    def latest(self, classroom: str) -> dict | None:
+        """
+        The classroom's current view, or None if nobody is broadcasting.
+        The view is shared by every follower and must not be changed.
+        """
+        with self._lock:
+            view = self._channels.get(classroom)
+            if view is not None and time.monotonic() - view["at"] > self.idle_seconds:
+                del self._channels[classroom]
+                return None
+            return view
+
+    def live(self) -> int:
+        """
+        Number of classrooms with a broadcast running.
+        """
+        now = time.monotonic()
+        with self._lock:
+            return sum(now - view["at"] <= self.idle_seconds for view in self._channels.values())
+
+
+BROADCAST = Broadcast()
@@ -0,0 +1,164 @@
+"""
+Registry of experiments, declared as data in registry.toml.
+
+The registry is parsed once and re-read only when the file changes. Each
+experiment's simulation module is imported the first time that experiment
+is opened, so adding experiments does not slow down the ones in use.
+
+Simulations return plain blocks rather than calling Streamlit, for example
+{"kind": "image", "image": array, "caption": text} or {"kind": "info",
+"text": text}. lab.ui.show_blocks draws them in the app; json_blocks turns
+them into data for lab/web/blocks.js, used by the slider scrubber and the
+offline export.
+"""
+import importlib
+import threading
+import tomllib
+from itertools import permutations
+from collections.abc import Callable
+from pathlib import Path
+
+REGISTRY_PATH = Path(__file__).with_name("registry.toml")
+
+# Approximate width in pixels of the right-hand column that holds the step
+# images in the wide layout. Used to pick a built image variant, by the app
+# and by the offline export alike.
+ASSET_COLUMN_WIDTH = 860
+
+_registry: list[dict] = []
+_registry_mtime: int | None = None
+_registry_lock = threading.Lock()
+
+
+def load_registry() -> list[dict]:
+    """
+    All experiments in menu order.
+    """
+    global _registry, _registry_mtime
+    mtime = REGISTRY_PATH.stat().st_mtime_ns
+    with _registry_lock:
+        if mtime != _registry_mtime:
+            with open(REGISTRY_PATH, "rb") as f:
+                experiments = tomllib.load(f)["experiment"]
+            check_registry(experiments)
+            _registry = experiments
+            _registry_mtime = mtime
+        return _registry
+
+
+def check_registry(experiments: list[dict]):
+    """
+    Raise ValueError if an experiment has no steps, or its steps' tab
+    labels are missing or repeated.
+    """
+    for experiment in experiments:
+        steps = experiment.get("step", [])
+        if not steps:
+            raise ValueError(f"{experiment['id']}: no [[experiment.step]] entries")
+        labels = [step.get("label") for step in steps]
+        if not all(labels) or len(set(labels)) != len(labels):
+            raise ValueError(f"{experiment['id']}: every step needs its own label, got {labels}")
+
+
+def step_labels(experiment: dict) -> list[str]:
+    """
+    The experiment's step tab labels, in order.
+    """
+    return [step["label"] for step in experiment["step"]]
+
+
+def get_experiment(experiment_id: str) -> dict:
+    for experiment in load_registry():
+        if experiment["id"] == experiment_id:
+            return experiment
+    raise KeyError(experiment_id)
+
+
+def load_simulation(experiment: dict, step: dict) -> Callable[..., list[dict]]:
+    """
+    A step's simulation function, importing the experiment's module on first use.
+    """
+    return getattr(importlib.import_module(experiment["module"]), step["simulation"])
+
+
+def run_simulation(experiment: dict, step: dict, values: dict) -> list[dict]:
+    """
+    Blocks to show for a step, given the values of its `inputs` by widget key.
+    """
+    simulation = load_simulation(experiment, step)
+    return simulation(**{key.split("_", 1)[1]: values[key] for key in step["inputs"]})
+
+
+def _rounded(values, digits: int) -> list[float]:
+    return [round(float(v), digits) for v in values]
+
+
+def json_blocks(blocks: list[dict], image_src: Callable[..., str]) -> list[dict]:
+    """
+    Blocks as JSON-ready data for blocks.js, with each image replaced by the
+    URL `image_src` gives it.
+    """
+    converted = []
+    for block in blocks:
+        block = dict(block)
+        if block["kind"] == "image":
+            block["src"] = image_src(block.pop("image"))
+        elif block["kind"] == "line_chart":
+            block["x"] = _rounded(block["x"], 2)
+            block["series"] = {name: _rounded(values, 3) for name, values in block["series"].items()}
+        converted.append(block)
+    return converted
+
+
+def widget_default(widget: dict):
+    """
+    The value a declared widget shows before the learner touches it.
+    """
+    kind = widget["kind"]
+    if kind == "slider":
+        return widget.get("value", widget["min_value"])
+    if kind == "multiselect":
+        return widget.get("default", [])
+    return widget["options"][widget.get("index", 0)]
+
+
+def find_widget(key: str) -> dict:
+    prefix = key.split("_", 1)[0]
+    for step in get_experiment(prefix)["step"]:
+        for widget in step.get("widgets", []):
+            if widget["key"] == key:
+                return widget
+    raise KeyError(key)
+
+
+def widget_choices(widget: dict) -> list:
+    """
+    Every value a declared widget can take. Multiselect choices are ordered,
+    as the order of picking shows in the texts.
+    """
+    kind = widget["kind"]
+    if kind == "slider":
+        return list(range(widget["min_value"], widget["max_value"] + 1, widget.get("step", 1)))
+    if kind == "multiselect":
+        limit = widget.get("max_selections", len(widget["options"]))
+        return [list(chosen) for n in range(limit + 1) for chosen in permutations(widget["options"], n)]
+    return list(widget["options"])
+
+
+def frozen_inputs(values: dict) -> tuple:
+    """
+    Input values as sorted (key, value) pairs, with lists made tuples, so
+    they can key a cache.
+    """
+    return tuple(sorted((key, tuple(value) if isinstance(value, list) else value) for key, value in values.items()))
+
+
+def scrubbed_slider(step: dict) -> dict | None:
+    """
+    The slider a step's results are scrubbed through in the browser: its
+    only slider, when the simulation depends on it.
+    """
+    sliders = [w for w in step.get("widgets", []) if w["kind"] == "slider"]
+    if len(sliders) == 1 and sliders[0]["key"] in step.get("inputs", []):
+        return sliders[0]
+    return None
@@ -0,0 +1,58 @@
+"""
+Experiment 3 - Exploring Colours: simulated beams and colour mixing.
+"""
+from lab.simulations import beam, colour_mix
+from lab.simulations.spectra import WAVELENGTHS
+
+
+def shine_the_light(colour: str, intensity: int) -> list[dict]:
+    # All dye and intensity combinations are rendered together on
+    # first use, so moving the slider is a lookup.
+    passed = beam.transmitted_fraction(colour, intensity)
+    image = {
+        "kind": "image",
+        "image": beam.frame_table()[(colour, intensity)],
+        "caption": f"Simulated beam on the wall: about {passed:.0%} of the torch light passes through",
+    }
+
+    if colour == "Red":
+        obs = "The beam looks more and more red as the colour intensity increases."
+    elif colour == "Blue":
+        obs = "The beam becomes deeper blue when the water is more coloured."
+    elif colour == "Green":
+        obs = "The beam gets a stronger green tone with higher intensity."
+    else:
+        obs = "The beam appears brighter yellow at medium intensity and darker at very high intensity."
+
+    return [image, {"kind": "success", "text": obs + " This simulates what learners might see in the real activity."}]
+
+
+def observe_the_beam(mix: list[str]) -> list[dict]:
+    if len(mix) != 2:
+        return [{"kind": "info", "text": "Select two colours to prompt a colour mixing discussion."}]
+
+    # Looked up from the table built when colour_mix was imported.
+    results = {mode: colour_mix.mix(mix[0], mix[1], mode) for mode in colour_mix.MODES}
+    return [
+        {
+            "kind": "info",
+            "text": f"Discuss with learners: What new colour might appear if {mix[0]} and {mix[1]} beams mix together",
+        },
+        {
+            "kind": "swatches",
+            "items": [
+                {"colour": result["hex"], "label": f"{colour_mix.MODES[mode]}: looks {result['name']}"}
+                for mode, result in results.items()
+            ],
+        },
+        {
+            "kind": "line_chart",
+            "x_label": "Wavelength (nm)",
+            "x": WAVELENGTHS,
+            "series": {
+                "Adding light": results["additive"]["spectrum"],
+                "Taking away light": results["subtractive"]["spectrum"],
+            },
+            "y_label": "Relative brightness",
+        },
+    ]
@@ -0,0 +1,34 @@
+"""
+Experiment 4 - Refraction with Water and Pencil: ray-traced views of the pencil.
+"""
+from lab.simulations import refraction
+
+
+def place_the_pencil(angle: int, clarity: str) -> list[dict]:
+    view = {
+        "kind": "image",
+        "image": refraction.frame_table()[(angle, clarity)],
+        "caption": f"Simulated view from {angle} degrees off vertical, {clarity.lower()} water",
+    }
+    if angle < 20:
+        message = {"kind": "info", "text": "From almost above, the bending is less visible."}
+    elif angle < 60:
+        message = {"kind": "success", "text": "From the side, the pencil looks clearly bent at the surface of the water."}
+    else:
+        message = {"kind": "info", "text": "From a very low side angle, the bending effect seems stronger."}
+    return [view, message]
+
+
+def observe_carefully(angle: int, clarity: str) -> list[dict]:
+    view = {
+        "kind": "image",
+        "image": refraction.frame_table()[(angle, clarity)],
+        "caption": f"Simulated view through {clarity.lower()} water",
+    }
+    if clarity == "Very clear":
+        text = "With clear water, the bending effect is easy to see."
+    elif clarity == "Somewhat cloudy":
+        text = "With somewhat cloudy water, the effect is still visible but less sharp."
+    else:
+        text = "With very cloudy water, you may need a brighter background to see the effect well."
+    return [view, {"kind": "info", "text": text}]
@@ -0,0 +1,56 @@
+"""
+Experiment 5 - Colourful Light Absorption: warming of every material under the lamp.
+"""
+from lab.simulations import thermal
+
+
+def shine_light_on_each_colour(material: str, time: int, context: str) -> list[dict]:
+    # Every material is simulated together, once per discussion context.
+    minutes, temps = thermal.simulate(context)
+    chart = {
+        "kind": "line_chart",
+        "x_label": "Minutes under the light",
+        "x": minutes,
+        "series": {m: temps[i] for i, m in enumerate(thermal.MATERIALS)},
+        "colours": thermal.CHART_COLOURS,
+        "y_label": "Surface temperature (°C)",
+    }
+
+    now = thermal.temperatures_at(context, time)
+    metrics = {
+        "kind": "metrics",
+        "items": [
+            {
+                "label": f"{name} (selected)" if name == material else name,
+                "value": f"{now[name]:.0f} °C",
+                "delta": f"{now[name] - thermal.AIR_TEMPERATURE:+.0f} °C",
+            }
+            for name in thermal.MATERIALS
+        ],
+        "delta_color": "inverse",
+    }
+
+    if material == "Black":
+        msg = "Black materials absorb more light and often feel warmer after some time."
+    elif material == "White":
+        msg = "White materials reflect much of the light and usually feel less warm."
+    elif material == "Red":
+        msg = "Red materials absorb many colours and reflect mostly red light."
+    else:
+        msg = "Blue materials absorb many colours and reflect mostly blue light."
+
+    return [
+        chart,
+        {"kind": "markdown", "text": "**Compare all materials**"},
+        metrics,
+        {"kind": "success", "text": msg + " At higher time values the warming effect in real life would usually be stronger."},
+    ]
+
+
+def observe_warmth(context: str) -> list[dict]:
+    return [
+        {
+            "kind": "info",
+            "text": f"Facilitators can link findings to {context.lower()} to support practical decision making.",
+        }
+    ]
@@ -0,0 +1,41 @@
+"""
+Experiment 6 - Ice Magnifying Glass: the object seen through simulated ice.
+"""
+from lab.asset_cache import ASSET_CACHE
+from lab.simulations import ice_lens
+
+
+def ice_lens_view(distance: int, melt: int, caption: str) -> dict:
+    """
+    The object seen through the simulated ice. Uses the teacher's setup
+    photo as the object when there is one.
+    """
+    pixels = ASSET_CACHE.get("assets/images/exp06_setup.png")
+    obj = ice_lens.default_object() if pixels is None else ice_lens.fit_object(pixels)
+    return {"kind": "image", "image": ice_lens.render_frame(obj, distance, melt), "caption": caption}
+
+
+def use_the_ice_as_a_lens(distance: int, melt: int) -> list[dict]:
+    view = ice_lens_view(
+        distance,
+        melt,
+        f"Simulated view through the ice: about {ice_lens.magnification(distance, melt):.1f} times bigger",
+    )
+    if distance <= 3:
+        message = {"kind": "info", "text": "Very close distance. The object may look larger but less clear."}
+    elif distance <= 7:
+        message = {"kind": "success", "text": "Medium distance. The object looks bigger and reasonably clear."}
+    else:
+        message = {"kind": "info", "text": "Larger distance. The magnifying effect becomes weaker."}
+    return [view, message]
+
+
+def observe_changes(distance: int, melt: int) -> list[dict]:
+    view = ice_lens_view(distance, melt, f"Simulated view through ice that is {melt}% melted")
+    if melt < 30:
+        text = "Ice is mostly solid. The magnification is more stable."
+    elif melt < 70:
+        text = "Ice is partly melted. Shapes may look distorted."
+    else:
+        text = "Ice is almost melted. The magnifying effect almost disappears."
+    return [view, {"kind": "info", "text": text}]
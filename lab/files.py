@@ -0,0 +1,45 @@
+"""
+File helpers shared by the app and the asset tools.
+
+The app reads files that the tools, other server processes and teachers
+may be rewriting at the same moment: manifests, optimised assets, decoded
+pixels, published images and the metrics file. Every writer goes through
+atomic_write, and every reader that caches a file checks it against its
+file_signature.
+"""
+import os
+import threading
+from pathlib import Path
+
+
+def atomic_write(path: str | Path, data: bytes | str):
+    """
+    Write `data` to `path`, text as UTF-8, creating its folder. The data
+    goes to a file alongside that is renamed over `path`, so a reader sees
+    either the old file or the new one, never half of one.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Named per process and thread, so concurrent writers never share it.
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        if isinstance(data, str):
+            tmp.write_text(data, encoding="utf-8")
+        else:
+            tmp.write_bytes(data)
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+def file_signature(path: str | Path) -> list[int] | None:
+    """
+    [mtime in ns, size] of the file at `path`, or None if it is missing.
+    A list, so it compares equal to one read back from a JSON manifest.
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
@@ -0,0 +1,37 @@
+"""
+Simulated images as WebP files named by their content.
+
+The app publishes frames into the static folder and the offline export
+writes them into its frames/ folder; both name and encode them here, so the
+same frame gets the same name and bytes in either.
+"""
+import hashlib
+import io
+from typing import TYPE_CHECKING
+
+# NumPy and Pillow are imported on first use, by the first frame.
+if TYPE_CHECKING:
+    import numpy as np
+
+FRAME_QUALITY = 80
+
+
+def frame_digest(image: "np.ndarray") -> str:
+    """
+    Name of a frame, from a hash of its pixels. Cheaper than encoding it,
+    so callers check for a frame they already have before encode_frame.
+    """
+    import numpy as np
+
+    return hashlib.sha1(np.ascontiguousarray(image).tobytes()).hexdigest()[:16]
+
+
+def encode_frame(image: "np.ndarray") -> bytes:
+    """
+    The frame as WebP.
+    """
+    from PIL import Image
+
+    buffer = io.BytesIO()
+    Image.fromarray(image).save(buffer, "WEBP", quality=FRAME_QUALITY, method=4)
+    return buffer.getvalue()
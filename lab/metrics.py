@@ -0,0 +1,253 @@
+"""
+Per-process counters and timing histograms for the lab app.
+
+Each thread records into its own shard, so recording never takes a lock
+and sessions never wait on each other. Readers add the shards up. Shards
+of finished threads are folded into one, so the number of shards stays
+small even though Streamlit runs each rerun on a fresh thread.
+
+A background thread writes the totals in Prometheus text format, for the
+node exporter's textfile collector or any scraper that can read a file.
+serve.py also serves them at /metrics for scrapers that pull over HTTP.
+"""
+import os
+import sys
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from functools import wraps
+from pathlib import Path
+
+from lab.asset_cache import ASSET_CACHE
+from lab.broadcast import BROADCAST
+from lab.files import atomic_write
+
+# Set LAB_METRICS_FILE to an empty string to turn the file off.
+DEFAULT_METRICS_PATH = os.environ.get("LAB_METRICS_FILE", "data/metrics.prom")
+DEFAULT_INTERVAL_SECONDS = 15.0
+
+# A session counts as active if it reran within this many seconds.
+ACTIVE_SESSION_SECONDS = 300.0
+
+# Upper bounds of the histogram buckets, in seconds.
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+HELP = {
+    "lab_render_seconds": ("histogram", "Time spent rendering a part of the page."),
+    "lab_asset_seconds": ("histogram", "Time spent sending one step asset."),
+    "lab_image_bytes_total": ("counter", "Bytes of step images shown; browsers fetch each once, then cache it."),
+    "lab_active_sessions": ("gauge", f"Sessions that reran in the last {ACTIVE_SESSION_SECONDS:.0f} seconds."),
+    "lab_asset_cache_hits_total": ("counter", "Asset cache lookups served from memory."),
+    "lab_asset_cache_misses_total": ("counter", "Asset cache lookups that read the disk."),
+    "lab_asset_cache_evictions_total": ("counter", "Assets dropped from the cache to stay in budget."),
+    "lab_asset_cache_bytes": ("gauge", "Bytes of pixels the asset cache has mapped from the shared store."),
+    "lab_remap_cache_hits_total": ("counter", "Ice lens remap tables reused."),
+    "lab_remap_cache_misses_total": ("counter", "Ice lens remap tables built."),
+    "lab_broadcasts_live": ("gauge", "Classrooms with a facilitator broadcast running."),
+    "lab_prefetch_jobs_total": ("counter", "Background jobs started to warm the next step."),
+    "lab_broadcast_views_total": ("counter", "Broadcast views drawn for following learners, without a simulation run."),
+}
+
+Labels = tuple[tuple[str, str], ...]
+
+
+class _Shard:
+    __slots__ = ("thread", "counters", "histograms")
+
+    def __init__(self, thread: threading.Thread | None):
+        self.thread = thread
+        self.counters: dict[tuple[str, Labels], float] = {}
+        # Per bucket counts, then the count above the last bucket, then the sum.
+        self.histograms: dict[tuple[str, Labels], list[float]] = {}
+
+
+def _merge(into: _Shard, shard: _Shard):
+    for key, value in shard.counters.items():
+        into.counters[key] = into.counters.get(key, 0) + value
+    for key, hist in shard.histograms.items():
+        total = into.histograms.setdefault(key, [0] * (len(BUCKETS) + 2))
+        for i, value in enumerate(hist):
+            total[i] += value
+
+
+def quantile(hist: list[float], q: float) -> float:
+    """
+    Upper bound in seconds of the bucket holding quantile `q`.
+    """
+    count = sum(hist[:-1])
+    if not count:
+        return 0.0
+    seen = 0
+    for bound, n in zip(BUCKETS, hist):
+        seen += n
+        if seen >= q * count:
+            return bound
+    return float("inf")
+
+
+class Metrics:
+    def __init__(self, path: str | Path = DEFAULT_METRICS_PATH, interval_seconds: float = DEFAULT_INTERVAL_SECONDS):
+        self.path = Path(path) if path else None
+        self.interval_seconds = interval_seconds
+        self._local = threading.local()
+        self._shards: list[_Shard] = []
+        # Only taken when a thread records for the first time, and by readers.
+        self._shards_lock = threading.Lock()
+        self._retired = _Shard(None)
+        self._sessions: dict[str, float] = {}
+        self._writer: threading.Thread | None = None
+
+    def _shard(self) -> _Shard:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = _Shard(threading.current_thread())
+            with self._shards_lock:
+                self._shards.append(shard)
+                if self._writer is None:
+                    self._writer = threading.Thread(target=self._run, name="metrics-writer", daemon=True)
+                    self._writer.start()
+        return shard
+
+    def inc(self, name: str, value: float = 1, **labels: str):
+        counters = self._shard().counters
+        key = (name, tuple(sorted(labels.items())))
+        counters[key] = counters.get(key, 0) + value
+
+    def observe(self, name: str, seconds: float, **labels: str):
+        histograms = self._shard().histograms
+        key = (name, tuple(sorted(labels.items())))
+        hist = histograms.get(key)
+        if hist is None:
+            hist = histograms[key] = [0] * (len(BUCKETS) + 2)
+        hist[bisect_left(BUCKETS, seconds)] += 1
+        hist[-1] += seconds
+
+    @contextmanager
+    def timed(self, part: str, **labels: str):
+        """
+        Time a block as lab_render_seconds{part=...}. Blocks nested inside
+        one labelled with an experiment are labelled with it too.
+        """
+        outer = getattr(self._local, "experiment", "")
+        experiment = labels.pop("experiment", outer)
+        self._local.experiment = experiment
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe("lab_render_seconds", time.perf_counter() - start, part=part, experiment=experiment, **labels)
+            self._local.experiment = outer
+
+    def instrument(self, func):
+        """
+        Decorator form of timed(), using the function name as the part.
+        """
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with self.timed(func.__name__):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    def seen_session(self, session_id: str):
+        self._sessions[session_id] = time.monotonic()
+
+    def active_sessions(self) -> int:
+        cutoff = time.monotonic() - ACTIVE_SESSION_SECONDS
+        for session_id, seen in list(self._sessions.items()):
+            if seen < cutoff:
+                self._sessions.pop(session_id, None)
+        return len(self._sessions)
+
+    def snapshot(self) -> _Shard:
+        """
+        Totals over every thread so far, plus cache and session figures.
+        """
+        total = _Shard(None)
+        with self._shards_lock:
+            # A finished thread will not record again, so its shard can be
+            # folded into the retired totals without racing a writer.
+            for shard in [s for s in self._shards if not s.thread.is_alive()]:
+                _merge(self._retired, shard)
+                self._shards.remove(shard)
+            _merge(total, self._retired)
+            for shard in self._shards:
+                # Copy first; the owning thread may add keys meanwhile.
+                live = _Shard(None)
+                live.counters = dict(shard.counters)
+                live.histograms = {k: list(v) for k, v in list(shard.histograms.items())}
+                _merge(total, live)
+
+        gauges = {"lab_active_sessions": self.active_sessions()}
+        stats = ASSET_CACHE.stats()
+        gauges["lab_asset_cache_hits_total"] = stats["hits"]
+        gauges["lab_asset_cache_misses_total"] = stats["misses"]
+        gauges["lab_asset_cache_evictions_total"] = stats["evictions"]
+        gauges["lab_asset_cache_bytes"] = stats["bytes"]
+        gauges["lab_broadcasts_live"] = BROADCAST.live()
+        # Only report the remap cache once an experiment has loaded it.
+        ice_lens = sys.modules.get("lab.simulations.ice_lens")
+        if ice_lens is not None:
+            info = ice_lens.remap_table.cache_info()
+            gauges["lab_remap_cache_hits_total"] = info.hits
+            gauges["lab_remap_cache_misses_total"] = info.misses
+        prefetch = sys.modules.get("lab.prefetch")
+        if prefetch is not None:
+            gauges["lab_prefetch_jobs_total"] = prefetch.PREFETCHER.submitted
+        for name, value in gauges.items():
+            total.counters[(name, ())] = value
+        return total
+
+    def render_prometheus(self) -> str:
+        snapshot = self.snapshot()
+        lines = []
+        series: dict[str, list[str]] = {}
+        for (name, labels), value in sorted(snapshot.counters.items()):
+            series.setdefault(name, []).append(f"{name}{_format_labels(labels)} {value:g}")
+        for (name, labels), hist in sorted(snapshot.histograms.items()):
+            out = series.setdefault(name, [])
+            cumulative = 0
+            for bound, n in zip(BUCKETS, hist):
+                cumulative += n
+                out.append(f"{name}_bucket{_format_labels(labels + (('le', f'{bound:g}'),))} {cumulative:g}")
+            cumulative += hist[len(BUCKETS)]
+            out.append(f"{name}_bucket{_format_labels(labels + (('le', '+Inf'),))} {cumulative:g}")
+            out.append(f"{name}_sum{_format_labels(labels)} {hist[-1]:.6f}")
+            out.append(f"{name}_count{_format_labels(labels)} {cumulative:g}")
+        for name, samples in series.items():
+            kind, text = HELP.get(name, ("untyped", name))
+            lines.append(f"# HELP {name} {text}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.extend(samples)
+        return "\n".join(lines) + "\n"
+
+    def write(self):
+        """
+        Write the Prometheus text file now, replacing it atomically.
+        """
+        if self.path is None:
+            return
+        atomic_write(self.path, self.render_prometheus())
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval_seconds)
+            try:
+                self.write()
+            except OSError:
+                # Keep folding shards even if the file cannot be written.
+                self.snapshot()
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    pairs = []
+    for key, value in labels:
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{key}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+METRICS = Metrics()
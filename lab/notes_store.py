@@ -0,0 +1,236 @@
+"""
+Learners' reflection notes, kept in SQLite.
+
+Notes are saved as learners type and written in batches by one background
+thread, so a rerun never waits on the database. Facilitators export them
+with python -m tools.export_notes.
+"""
+import atexit
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_PATH = os.environ.get("LAB_NOTES_DB", "data/notes.sqlite3")
+
+# Edits arriving within this many seconds are written in one transaction.
+DEFAULT_DEBOUNCE_SECONDS = 1.0
+
+# A failed write is retried after the debounce time, doubling up to this.
+MAX_RETRY_SECONDS = 60.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS notes (
+    classroom TEXT NOT NULL,
+    session_id TEXT NOT NULL,
+    note_key TEXT NOT NULL,
+    key_prefix TEXT NOT NULL,
+    question_no INTEGER NOT NULL,
+    question TEXT NOT NULL,
+    body TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (classroom, session_id, note_key)
+);
+CREATE INDEX IF NOT EXISTS notes_by_prefix ON notes (key_prefix, updated_at);
+"""
+
+UPSERT = """
+INSERT INTO notes (classroom, session_id, note_key, key_prefix, question_no, question, body, updated_at)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (classroom, session_id, note_key) DO UPDATE SET
+    body = excluded.body,
+    question = excluded.question,
+    updated_at = excluded.updated_at
+WHERE excluded.updated_at >= notes.updated_at
+"""
+
+
+def connect(path: str | Path) -> sqlite3.Connection:
+    """
+    Open the notes database in WAL mode, creating it if needed.
+    WAL lets sessions read while the writer thread commits.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+class NotesStore:
+    """
+    Durable storage for reflection notes, shared by every session.
+
+    save() only records the latest text in memory and returns at once. A
+    single background thread waits for edits to settle, then writes every
+    pending note in one transaction, so reruns never wait on the disk and
+    sessions never contend for the SQLite write lock.
+    """
+
+    def __init__(self, path: str | Path = DEFAULT_DB_PATH, debounce_seconds: float = DEFAULT_DEBOUNCE_SECONDS):
+        self.path = Path(path)
+        self.debounce_seconds = debounce_seconds
+        self._pending: dict[tuple[str, str, str], tuple] = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._writer: threading.Thread | None = None
+
+    def save(self, classroom: str, session_id: str, key_prefix: str, question_no: int, question: str, body: str):
+        note_key = f"{key_prefix}_q{question_no}"
+        row = (classroom, session_id, note_key, key_prefix, question_no, question, body, time.time())
+        with self._lock:
+            self._pending[(classroom, session_id, note_key)] = row
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._run, name="notes-writer", daemon=True)
+                self._writer.start()
+        self._wake.set()
+
+    def load(self, classroom: str, session_id: str, key_prefix: str) -> dict[str, str]:
+        """
+        Saved notes for one session and experiment, keyed like the text
+        areas (for example `exp3_q1`). Includes edits not yet written.
+        """
+        notes = {}
+        if self.path.exists():
+            conn = sqlite3.connect(self.path, timeout=30)
+            try:
+                rows = conn.execute(
+                    "SELECT note_key, body FROM notes WHERE classroom = ? AND session_id = ? AND key_prefix = ?",
+                    (classroom, session_id, key_prefix),
+                )
+                notes.update(rows)
+            except sqlite3.Error:
+                logger.exception("Could not read notes from %s", self.path)
+            finally:
+                conn.close()
+        with self._lock:
+            for (c, s, note_key), row in self._pending.items():
+                if c == classroom and s == session_id and row[3] == key_prefix:
+                    notes[note_key] = row[6]
+        return notes
+
+    def flush(self):
+        """
+        Write pending notes now, from the calling thread.
+        """
+        batch = self._take_pending()
+        if not batch:
+            return
+        try:
+            conn = connect(self.path)
+        except Exception:
+            logger.exception("Could not open %s to write %d notes", self.path, len(batch))
+            self._put_back(batch)
+            return
+        try:
+            self._write(conn, batch)
+        finally:
+            conn.close()
+
+    def _take_pending(self) -> dict[tuple[str, str, str], tuple]:
+        with self._lock:
+            batch, self._pending = self._pending, {}
+            self._wake.clear()
+        return batch
+
+    def _put_back(self, batch: dict[tuple[str, str, str], tuple]):
+        # Unless a newer edit of the same note has arrived meanwhile.
+        with self._lock:
+            for key, row in batch.items():
+                self._pending.setdefault(key, row)
+
+    def _write(self, conn: sqlite3.Connection, batch: dict[tuple[str, str, str], tuple]) -> bool:
+        try:
+            with conn:
+                conn.executemany(UPSERT, batch.values())
+        except Exception:
+            logger.exception("Could not write %d notes to %s, will retry", len(batch), self.path)
+            self._put_back(batch)
+            return False
+        return True
+
+    def _run(self):
+        conn = None
+        delay = self.debounce_seconds
+        try:
+            while True:
+                self._wake.wait()
+                # Let a burst of edits settle so it becomes a single transaction.
+                time.sleep(self.debounce_seconds)
+                batch = self._take_pending()
+                if not batch:
+                    continue
+                try:
+                    if conn is None:
+                        conn = connect(self.path)
+                    written = self._write(conn, batch)
+                except Exception:
+                    logger.exception("Could not open %s to write %d notes, will retry", self.path, len(batch))
+                    self._put_back(batch)
+                    written = False
+                if written:
+                    delay = self.debounce_seconds
+                    continue
+                # Reopen on the next try, and back off while the disk is failing.
+                if conn is not None:
+                    conn.close()
+                    conn = None
+                time.sleep(delay)
+                delay = min(delay * 2, MAX_RETRY_SECONDS)
+                self._wake.set()
+        finally:
+            # The next save() starts a new writer.
+            with self._lock:
+                self._writer = None
+
+
+EXPORT_COLUMNS = ("classroom", "session_id", "key_prefix", "question_no", "question", "body", "updated_at")
+
+
+def iter_notes(
+    conn: sqlite3.Connection,
+    prefixes: list[str] | None = None,
+    since: float | None = None,
+    until: float | None = None,
+    classroom: str | None = None,
+    batch_size: int = 5000,
+):
+    """
+    Yield lists of note rows (in EXPORT_COLUMNS order) matching the filters,
+    `batch_size` rows at a time from a cursor, so memory stays flat however
+    many notes there are.
+    """
+    where, params = [], []
+    if prefixes:
+        where.append(f"key_prefix IN ({', '.join('?' * len(prefixes))})")
+        params.extend(prefixes)
+    if since is not None:
+        where.append("updated_at >= ?")
+        params.append(since)
+    if until is not None:
+        where.append("updated_at < ?")
+        params.append(until)
+    if classroom is not None:
+        where.append("classroom = ?")
+        params.append(classroom)
+    sql = f"SELECT {', '.join(EXPORT_COLUMNS)} FROM notes"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY key_prefix, updated_at"
+
+    cursor = conn.execute(sql, params)
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            break
+        yield rows
+
+
+NOTES = NotesStore()
+atexit.register(NOTES.flush)
@@ -0,0 +1,123 @@
+"""
+Background warming of the step a learner is likely to open next.
+
+Learners go through an experiment's steps in order, then on to the next
+experiment in the menu. While they read the step in front of them, a small
+thread pool does the slow parts of showing the following one: publishing
+its image or clip into the static folder, and building its scrub table or
+running its simulation once with the learner's current inputs, which also
+imports the simulation module and maps the assets it reads. Opening that
+step then finds everything in the caches.
+"""
+import logging
+import os
+import threading
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+
+from lab.asset_cache import ASSET_CACHE
+from lab.asset_variants import pick_variant, pick_video
+from lab.experiments import get_experiment, run_simulation, scrubbed_slider
+from lab.scrubber import scrub_table
+from lab.static_assets import STATIC_ASSETS
+
+logger = logging.getLogger(__name__)
+
+# Worker threads per process; 0 turns prefetching off.
+DEFAULT_WORKERS = int(os.environ.get("LAB_PREFETCH_WORKERS", "2"))
+
+# Longest a step waits for its own prefetch to finish rather than doing the
+# same work again alongside it.
+JOIN_TIMEOUT_SECONDS = 5.0
+
+
+class Prefetcher:
+    """
+    Runs warming jobs on a thread pool, at most once at a time per key.
+
+    Sessions ask for the same few steps over and over, so a job whose key
+    is already queued or running is not queued again. The pool is started
+    on the first job.
+    """
+
+    def __init__(self, workers: int = DEFAULT_WORKERS):
+        self.workers = workers
+        self._pool: ThreadPoolExecutor | None = None
+        self._pending: dict[tuple, Future] = {}
+        self._lock = threading.Lock()
+        self.submitted = 0
+
+    def submit(self, key: tuple, func: Callable, *args):
+        """
+        Run `func(*args)` in the background unless `key` is already pending.
+        """
+        if self.workers <= 0:
+            return
+        with self._lock:
+            if key in self._pending:
+                return
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="prefetch")
+            future = self._pool.submit(self._run, func, args)
+            self._pending[key] = future
+            self.submitted += 1
+        future.add_done_callback(lambda _: self._done(key))
+
+    def join(self, key: tuple):
+        """
+        Wait for the job with `key`, if one is pending, so its result is in
+        the cache by the time the caller looks.
+        """
+        with self._lock:
+            future = self._pending.get(key)
+        if future is not None:
+            try:
+                future.result(timeout=JOIN_TIMEOUT_SECONDS)
+            except TimeoutError:
+                pass
+
+    def _done(self, key: tuple):
+        with self._lock:
+            self._pending.pop(key, None)
+
+    @staticmethod
+    def _run(func: Callable, args: tuple):
+        try:
+            func(*args)
+        except Exception:
+            # Prefetching is only a head start; the step does the work itself
+            # when it is opened, and reports any error there.
+            logger.exception("Prefetch of %s%r failed", func.__name__, args)
+
+
+def warm_asset(path: str, width: int, quality: str):
+    """
+    Publish the files show_asset would use for `path`.
+    """
+    name = Path(path).stem
+    video = pick_video(path, width, quality)
+    if video is not None:
+        for variant in [video["poster"], *video["sources"]]:
+            STATIC_ASSETS.publish(variant["path"], name)
+        return
+    variant = pick_variant(path, width, quality)
+    STATIC_ASSETS.publish(variant["path"] if variant else path, name)
+
+
+def warm_simulation(experiment_id: str, step_no: int, inputs: tuple):
+    """
+    Fill the caches a step's simulation reads, given its inputs as made by
+    frozen_inputs.
+    """
+    experiment = get_experiment(experiment_id)
+    step = experiment["step"][step_no]
+    slider = scrubbed_slider(step)
+    if slider is None:
+        run_simulation(experiment, step, {key: list(v) if isinstance(v, tuple) else v for key, v in inputs})
+    else:
+        fixed = tuple(item for item in inputs if item[0] != slider["key"])
+        scrub_table(experiment_id, step_no, slider["key"], fixed, ASSET_CACHE.generation())
+
+
+PREFETCHER = Prefetcher()
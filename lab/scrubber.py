@@ -0,0 +1,110 @@
+"""
+Slider scrubbing, and drawing simulation results, in the browser.
+
+A step's slider is drawn by a custom component that is sent the results for
+every slider position at once, with the other inputs held at their current
+values. Dragging redraws from that table with no round-trip to the server;
+the chosen value comes back to Python only when the slider is released, so
+other steps and the reflection notes see it.
+
+blocks_view draws a list of blocks the same way, with no slider; learners
+following a facilitator's broadcast are shown results with it.
+"""
+from functools import lru_cache, partial
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import streamlit as st
+
+from lab.asset_cache import ASSET_CACHE
+from lab.experiments import frozen_inputs, get_experiment, json_blocks, run_simulation, widget_choices
+from lab.frames import encode_frame, frame_digest
+from lab.static_assets import STATIC_ASSETS
+
+if TYPE_CHECKING:
+    import numpy as np
+
+WEB_DIR = Path(__file__).with_name("web")
+
+SCRUBBER_CSS = (WEB_DIR / "blocks.css").read_text()
+# blocks.js defines renderBlocks() for the module that follows it.
+SCRUBBER_JS = (WEB_DIR / "blocks.js").read_text() + "\n" + (WEB_DIR / "scrubber.js").read_text()
+BLOCKS_VIEW_JS = (WEB_DIR / "blocks.js").read_text() + "\n" + (WEB_DIR / "blocks_view.js").read_text()
+
+
+# Frame URLs by content. The same frame turns up in several tables (the ice
+# lens at one distance and melt is in the table of both sliders), so each
+# is encoded and published once.
+_FRAMES: dict[str, str] = {}
+
+
+def frame_url(image: "np.ndarray") -> str:
+    """
+    Static URL of a simulation frame, encoded as WebP the first time.
+    """
+    digest = frame_digest(image)
+    url = _FRAMES.get(digest)
+    if url is None:
+        url = _FRAMES[digest] = STATIC_ASSETS.publish_bytes(encode_frame(image), ".webp", "frame")
+    return url
+
+
+@lru_cache(maxsize=256)
+def scrub_table(experiment_id: str, step_no: int, slider_key: str, fixed: tuple, assets: int) -> list[list[dict]]:
+    """
+    Blocks for every position of a step's slider, as JSON-ready data with
+    frames as static URLs, given the other inputs as made by frozen_inputs.
+    Kept per combination; there are about 130 in all, sharing their frames.
+    `assets` is ASSET_CACHE.generation(), so tables drawn from a teacher's
+    photo are built again once it is replaced.
+    """
+    experiment = get_experiment(experiment_id)
+    step = experiment["step"][step_no]
+    slider = next(w for w in step["widgets"] if w["key"] == slider_key)
+    values = {key: list(value) if isinstance(value, tuple) else value for key, value in fixed}
+    return [
+        json_blocks(run_simulation(experiment, step, {**values, slider_key: position}), frame_url)
+        for position in widget_choices(slider)
+    ]
+
+
+def _keep_value(key: str):
+    # Runs before the rerun, so every step already sees the released value
+    # under the slider's own key, which also survives the tab being closed.
+    st.session_state[key] = st.session_state[f"scrub_{key}"]["value"]
+
+
+def scrubber(experiment: dict, step_no: int, slider: dict, inputs: dict) -> list[dict]:
+    """
+    Show a step's slider and its results as a scrubber. `inputs` holds the
+    current value of every input, the slider included. Returns the blocks
+    for that value, as JSON-ready data.
+    """
+    key = slider["key"]
+    fixed = frozen_inputs({k: v for k, v in inputs.items() if k != key})
+    # Registered on every call, as the registry belongs to the running
+    # Streamlit runtime; registering the same definition again is a no-op.
+    component = st.components.v2.component("lab_scrubber", css=SCRUBBER_CSS, js=SCRUBBER_JS)
+    views = scrub_table(experiment["id"], step_no, key, fixed, ASSET_CACHE.generation())
+    component(
+        # Not prefixed with the experiment, so step_tabs leaves it alone.
+        key=f"scrub_{key}",
+        data={
+            "label": slider["label"],
+            "min": slider["min_value"],
+            "max": slider["max_value"],
+            "step": slider.get("step", 1),
+            "value": inputs[key],
+            "views": views,
+        },
+        on_value_change=partial(_keep_value, key),
+    )
+    return views[widget_choices(slider).index(inputs[key])]
+
+
+def blocks_view(blocks: list[dict], key: str):
+    """
+    Draw JSON-ready blocks, as made by json_blocks, in the browser.
+    """
+    component = st.components.v2.component("lab_blocks", css=SCRUBBER_CSS, js=BLOCKS_VIEW_JS)
+    component(key=key, data={"blocks": blocks})
@@ -0,0 +1,6 @@
+"""
+NumPy models behind the interactive steps of each experiment.
+
+Modules here do not import Streamlit, so they can be used by offline
+tools as well as by the app.
+"""
@@ -0,0 +1,102 @@
+"""
+Experiment 3: what colour appears when two of the coloured lights or dyes mix.
+
+Additive mixing overlaps two torch beams, each filtered by one glass, so
+their spectra add. Subtractive mixing puts both dyes in one glass, so their
+absorbances add and a single beam passes through both. Spectra are turned
+into an sRGB swatch with the CIE matching functions.
+
+With four dyes there are only six pairs, so every pair and both modes are
+computed once when the module is imported.
+"""
+from itertools import combinations
+
+import numpy as np
+
+from lab.simulations.beam import transmittance
+from lab.simulations.spectra import DYE_ABSORBANCE, DYE_NAMES, TORCH, encode_srgb, spectrum_to_rgb
+
+MODES = {
+    "additive": "Beams overlapping on the wall (adding light)",
+    "subtractive": "Dyes mixed in one glass (taking away light)",
+}
+
+# Dye strength used for the mixing table, as on the intensity slider.
+MIX_INTENSITY = 5
+
+_HUE_NAMES = [
+    (15, "red"),
+    (40, "orange"),
+    (65, "yellow"),
+    (90, "yellow-green"),
+    (150, "green"),
+    (190, "turquoise"),
+    (250, "blue"),
+    (290, "violet"),
+    (335, "pink or magenta"),
+    (360, "red"),
+]
+
+
+def describe(rgb: np.ndarray) -> str:
+    """
+    A plain colour word for an sRGB swatch, for learners to compare with
+    what they see.
+    """
+    r, g, b = np.asarray(rgb, dtype=float) / 255.0
+    high, low = max(r, g, b), min(r, g, b)
+    if high < 0.15:
+        return "very dark, almost black"
+    if high - low < 0.12:
+        if high > 0.85:
+            return "white"
+        return "dark grey" if high < 0.45 else "grey"
+    if high == r:
+        hue = (60 * (g - b) / (high - low)) % 360
+    elif high == g:
+        hue = 60 * (b - r) / (high - low) + 120
+    else:
+        hue = 60 * (r - g) / (high - low) + 240
+    name = next(label for limit, label in _HUE_NAMES if hue < limit)
+    if name in ("orange", "yellow") and high < 0.6:
+        return "brown"
+    return f"dark {name}" if high < 0.45 else name
+
+
+def _build_table() -> dict[tuple[str, str, str], dict]:
+    pairs = list(combinations(DYE_NAMES, 2))
+    first = np.stack([DYE_ABSORBANCE[a] for a, _ in pairs])
+    second = np.stack([DYE_ABSORBANCE[b] for _, b in pairs])
+
+    spectra = {
+        "additive": TORCH * (transmittance(first, MIX_INTENSITY) + transmittance(second, MIX_INTENSITY)),
+        "subtractive": TORCH * transmittance(first + second, MIX_INTENSITY),
+    }
+    # Scale so the brightest channel of unfiltered light, one torch or two, sits just below white.
+    whites = {"additive": 2 * TORCH, "subtractive": TORCH}
+
+    table = {}
+    for mode, spectrum in spectra.items():
+        white = whites[mode]
+        rgb = np.clip(spectrum_to_rgb(spectrum, white=white), 0.0, None) * 0.95 / spectrum_to_rgb(white, white=white).max()
+        swatches = encode_srgb(rgb)
+        for i, (a, b) in enumerate(pairs):
+            entry = {
+                "rgb": swatches[i],
+                "hex": "#{:02x}{:02x}{:02x}".format(*swatches[i]),
+                "name": describe(swatches[i]),
+                "spectrum": spectrum[i] / white.max(),
+            }
+            table[(a, b, mode)] = entry
+            table[(b, a, mode)] = entry
+    return table
+
+
+MIX_TABLE = _build_table()
+
+
+def mix(first: str, second: str, mode: str) -> dict:
+    """
+    Swatch, colour name and relative spectrum for two dyes mixed in `mode`.
+    """
+    return MIX_TABLE[(first, second, mode)]
@@ -0,0 +1,130 @@
+"""
+Experiment 6: looking at a small object through a piece of ice.
+
+The ice is a thin lens between the object and a fixed eye. With the lens
+at a fraction x of the way from object to eye, the eye sees the object
+magnified by M = 1 / (1 - P * x * (1 - x)), where P is the lens power times
+the eye distance. The effect is strongest half way and fades at both ends.
+Melting flattens the lens, shrinks it and ripples its surface.
+
+Each (distance, melt) pair becomes a remap table: for every output pixel,
+the index of the object pixel it shows plus a brightness factor. Applying
+a table is a single NumPy gather.
+"""
+import os
+from functools import lru_cache
+
+import numpy as np
+from PIL import Image, ImageOps
+
+FRAME_HEIGHT = 200
+FRAME_WIDTH = 300
+
+# Lens power times eye distance for solid ice; gives about 3x half way.
+SOLID_POWER = 8.0 / 3.0
+LENS_RADIUS = 82.0
+MAX_RIPPLE = 5.0
+
+DISTANCES = range(1, 11)
+MELT_LEVELS = range(0, 101)
+
+# uint16 pixel indices plus uint8 brightness per pixel.
+TABLE_BYTES = FRAME_HEIGHT * FRAME_WIDTH * 3
+REMAP_CACHE_BYTES = int(os.environ.get("LAB_REMAP_CACHE_MB", "48")) * 1024 * 1024
+
+
+def magnification(distance: int, melt: int) -> float:
+    """
+    Magnification at the centre of the ice for the slider values.
+    """
+    x = distance / (DISTANCES[-1] + 1)
+    power = SOLID_POWER * (1.0 - 0.9 * melt / 100)
+    return 1.0 / (1.0 - power * x * (1.0 - x))
+
+
+@lru_cache(maxsize=max(1, REMAP_CACHE_BYTES // TABLE_BYTES))
+def remap_table(distance: int, melt: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Source pixel index and brightness (128 = unchanged) for every output
+    pixel. Least recently used tables are dropped past the memory budget.
+    """
+    m = melt / 100
+    yy, xx = np.mgrid[0:FRAME_HEIGHT, 0:FRAME_WIDTH].astype(np.float32)
+    cy, cx = FRAME_HEIGHT / 2, FRAME_WIDTH / 2
+    dy, dx = yy - cy, xx - cx
+    radius = LENS_RADIUS * (1.0 - 0.35 * m)
+    rho = np.hypot(dx, dy) / radius
+    inside = rho < 1.0
+
+    # Magnification eases off towards the rim, like a real rounded lump.
+    centre = magnification(distance, melt)
+    local = 1.0 + (centre - 1.0) * np.sqrt(np.clip(1.0 - rho**2, 0.0, 1.0))
+    src_x = cx + dx / local
+    src_y = cy + dy / local
+
+    # A melting surface ripples; worst when partly melted.
+    ripple = MAX_RIPPLE * np.sin(np.pi * m)
+    src_x += ripple * np.sin(2 * np.pi * yy / 37.0 + 3.0 * m)
+    src_y += ripple * np.cos(2 * np.pi * xx / 29.0 + 5.0 * m)
+
+    src_x = np.where(inside, src_x, xx)
+    src_y = np.where(inside, src_y, yy)
+    sx = np.clip(np.rint(src_x), 0, FRAME_WIDTH - 1).astype(np.uint16)
+    sy = np.clip(np.rint(src_y), 0, FRAME_HEIGHT - 1).astype(np.uint16)
+    index = sy * np.uint16(FRAME_WIDTH) + sx
+
+    brightness = np.full(inside.shape, 128, dtype=np.uint8)
+    brightness[inside] = 122
+    brightness[inside & (rho > 1.0 - 4.0 / radius)] = 165
+    return index, brightness
+
+
+def apply_remap(obj: np.ndarray, table: tuple[np.ndarray, np.ndarray]) -> np.ndarray:
+    """
+    Warp an object image of shape (FRAME_HEIGHT, FRAME_WIDTH, 3) through a table.
+    """
+    index, brightness = table
+    warped = obj.reshape(-1, 3)[index].astype(np.uint16)
+    return np.minimum(warped * brightness[..., None] // 128, 255).astype(np.uint8)
+
+
+def render_frame(obj: np.ndarray, distance: int, melt: int) -> np.ndarray:
+    return apply_remap(obj, remap_table(distance, melt))
+
+
+_fitted: tuple[np.ndarray | None, np.ndarray | None] = (None, None)
+
+
+def fit_object(pixels: np.ndarray) -> np.ndarray:
+    """
+    Crop and scale a photo's pixels to the frame. The last result is kept,
+    so the same image from the asset cache is only resized once.
+    """
+    global _fitted
+    if _fitted[0] is not pixels:
+        fitted = ImageOps.fit(Image.fromarray(pixels).convert("RGB"), (FRAME_WIDTH, FRAME_HEIGHT))
+        _fitted = (pixels, np.asarray(fitted))
+    return _fitted[1]
+
+
+@lru_cache(maxsize=1)
+def default_object() -> np.ndarray:
+    """
+    A leaf on a card with rows of tiny print, used when no photo is provided.
+    """
+    yy, xx = np.mgrid[0:FRAME_HEIGHT, 0:FRAME_WIDTH].astype(np.float32)
+    img = np.empty((FRAME_HEIGHT, FRAME_WIDTH, 3), dtype=np.float32)
+    img[:] = (238, 232, 214)
+
+    # Rows of small "letters" across the card.
+    letters = ((yy % 14) < 6) & ((xx % 7) < 4) & ((xx // 7 + yy // 14) % 5 != 0)
+    img[letters] = (70, 70, 80)
+
+    # A leaf with a midrib and side veins.
+    u = (xx - FRAME_WIDTH / 2) / 70.0
+    v = (yy - FRAME_HEIGHT / 2) / 34.0
+    leaf = u**2 + (v / (1.0 - 0.45 * u)) ** 2 < 1.0
+    img[leaf] = (70, 140, 60)
+    veins = leaf & ((np.abs(v) < 0.05) | (np.abs((np.abs(v) - 0.8 * (u + 1.0)) % 0.45) < 0.04))
+    img[veins] = (160, 200, 120)
+    return img.astype(np.uint8)
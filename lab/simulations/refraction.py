@@ -0,0 +1,195 @@
+"""
+Experiment 4: a pencil standing in water, seen from different angles.
+
+One ray per pixel is traced from an orthographic camera. Rays that reach the
+water surface are bent with Snell's law, then tested against the pencil and
+the tiled bottom of the glass. Cloudy water scatters light along the
+underwater part of each ray and blurs what is seen through it.
+"""
+from functools import cache
+
+import numpy as np
+
+from lab.simulations.spectra import encode_srgb
+
+N_AIR = 1.0
+N_WATER = 1.33
+
+ANGLES = np.arange(0, 91, 5)
+CLARITIES = ["Very clear", "Somewhat cloudy", "Quite cloudy"]
+
+# Scattering coefficient per unit of underwater path, and blur in pixels.
+TURBIDITY = {
+    "Very clear": (0.0, 0.0),
+    "Somewhat cloudy": (0.45, 1.5),
+    "Quite cloudy": (0.9, 3.5),
+}
+
+# A ray parallel to the surface never enters the water, so the camera stops
+# just short of looking along it.
+MAX_CAMERA_ANGLE = 84.0
+
+FRAME_HEIGHT = 180
+FRAME_WIDTH = 240
+VIEW_HALF_WIDTH = 1.4
+
+WATER_DEPTH = 1.2
+PENCIL_TOP = np.array([-0.55, 1.1, 0.45])
+PENCIL_TIP = np.array([0.45, -1.05, -0.35])
+PENCIL_RADIUS = 0.07
+
+PENCIL_COLOUR = np.array([0.95, 0.72, 0.12])
+GRAPHITE_COLOUR = np.array([0.12, 0.12, 0.13])
+TILE_COLOURS = np.array([[0.82, 0.86, 0.9], [0.45, 0.55, 0.68]])
+WATER_TINT = np.array([0.9, 0.96, 1.0])
+MILKY_WATER = np.array([0.72, 0.76, 0.74])
+
+
+def refract(d: np.ndarray, normal: np.ndarray, n1: float, n2: float) -> np.ndarray:
+    """
+    Snell's law in vector form for unit directions `d` of shape (n, 3)
+    crossing a surface with unit `normal` facing the incoming rays.
+    Going into a denser medium, total internal reflection cannot happen.
+    """
+    eta = n1 / n2
+    cos_i = -(d @ normal)
+    k = 1.0 - eta**2 * (1.0 - cos_i**2)
+    return eta * d + (eta * cos_i - np.sqrt(np.maximum(k, 0.0)))[:, None] * normal
+
+
+def _camera_rays(angle: float) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Origins and the shared direction of one ray per pixel for a camera
+    `angle` degrees away from looking straight down.
+    """
+    theta = np.radians(min(angle, MAX_CAMERA_ANGLE))
+    direction = np.array([0.0, -np.cos(theta), -np.sin(theta)])
+    right = np.array([1.0, 0.0, 0.0])
+    up = np.array([0.0, np.sin(theta), -np.cos(theta)])
+
+    half_height = VIEW_HALF_WIDTH * FRAME_HEIGHT / FRAME_WIDTH
+    u = np.linspace(-VIEW_HALF_WIDTH, VIEW_HALF_WIDTH, FRAME_WIDTH)
+    v = np.linspace(half_height, -half_height, FRAME_HEIGHT)
+    uu, vv = np.meshgrid(u, v)
+    origins = uu.reshape(-1, 1) * right + vv.reshape(-1, 1) * up - 5.0 * direction
+    return origins, direction
+
+
+def _hit_pencil(origins, dirs, t_max, below_surface: bool):
+    """
+    Closest approach of each ray to the pencil axis. Returns the ray
+    distance of the hit (inf for misses), the position along the pencil
+    (0 at the top, 1 at the tip) and the distance from the axis.
+    """
+    axis = PENCIL_TIP - PENCIL_TOP
+    length = np.linalg.norm(axis)
+    a = axis / length
+    w0 = origins - PENCIL_TOP
+    b = dirs @ a
+    d_w = np.einsum("ij,ij->i", dirs, w0)
+    a_w = w0 @ a
+    denom = np.maximum(1.0 - b**2, 1e-9)
+    t = (b * a_w - d_w) / denom
+    s = (a_w - b * d_w) / denom
+    gap = np.linalg.norm(w0 + t[:, None] * dirs - s[:, None] * a, axis=1)
+
+    point_y = PENCIL_TOP[1] + s * a[1]
+    on_part = (point_y < 0.0) if below_surface else (point_y >= 0.0)
+    hit = (gap < PENCIL_RADIUS) & (s >= 0.0) & (s <= length) & (t > 0.0) & (t < t_max) & on_part
+    return np.where(hit, t, np.inf), s / length, gap / PENCIL_RADIUS
+
+
+def _pencil_colour(along: np.ndarray, edge: np.ndarray) -> np.ndarray:
+    # Shade towards the edges so the pencil reads as round, sharpened tip is graphite.
+    shade = (1.0 - 0.55 * edge**2)[:, None]
+    colour = np.where((along > 0.93)[:, None], GRAPHITE_COLOUR, PENCIL_COLOUR)
+    return colour * shade
+
+
+def trace(angle: int) -> dict[str, np.ndarray]:
+    """
+    Trace the scene for one viewing angle. Returns the linear colour seen
+    by each pixel before scattering, the underwater path length and a mask
+    of pixels whose ray went into the water.
+    """
+    origins, direction = _camera_rays(float(angle))
+    n = origins.shape[0]
+    dirs = np.broadcast_to(direction, origins.shape)
+    colour = np.zeros((n, 3))
+
+    # Air: the pencil above the surface, then the surface itself.
+    t_surface = -origins[:, 1] / direction[1]
+    t_air, along, edge = _hit_pencil(origins, dirs, t_surface, below_surface=False)
+    in_air = np.isfinite(t_air)
+    colour[in_air] = _pencil_colour(along[in_air], edge[in_air])
+
+    # Water: bend at the surface and look for the pencil or the bottom.
+    wet = ~in_air
+    entry = origins[wet] + t_surface[wet, None] * direction
+    bent = refract(dirs[wet], np.array([0.0, 1.0, 0.0]), N_AIR, N_WATER)
+    t_floor = (-WATER_DEPTH - entry[:, 1]) / bent[:, 1]
+    t_water, along, edge = _hit_pencil(entry, bent, t_floor, below_surface=True)
+    on_pencil = np.isfinite(t_water)
+
+    floor = entry + t_floor[:, None] * bent
+    checker = (np.floor(floor[:, 0] / 0.25) + np.floor(floor[:, 2] / 0.25)).astype(int) % 2
+    wet_colour = TILE_COLOURS[checker]
+    wet_colour[on_pencil] = _pencil_colour(along[on_pencil], edge[on_pencil])
+    colour[wet] = wet_colour * WATER_TINT
+
+    path = np.zeros(n)
+    path[wet] = np.where(on_pencil, t_water, t_floor)
+    return {
+        "colour": colour.reshape(FRAME_HEIGHT, FRAME_WIDTH, 3),
+        "path": path.reshape(FRAME_HEIGHT, FRAME_WIDTH),
+        "wet": wet.reshape(FRAME_HEIGHT, FRAME_WIDTH),
+    }
+
+
+def _blur(image: np.ndarray, sigma: float) -> np.ndarray:
+    """
+    Separable Gaussian blur of an (H, W, C) image, edges repeated.
+    """
+    radius = int(np.ceil(3 * sigma))
+    x = np.arange(-radius, radius + 1)
+    kernel = np.exp(-0.5 * (x / sigma) ** 2)
+    kernel /= kernel.sum()
+    for axis in (0, 1):
+        pad = [(0, 0)] * image.ndim
+        pad[axis] = (radius, radius)
+        windows = np.lib.stride_tricks.sliding_window_view(np.pad(image, pad, mode="edge"), len(x), axis=axis)
+        image = windows @ kernel
+    return image
+
+
+def render_frame(angle: int, clarity: str, traced: dict[str, np.ndarray] | None = None) -> np.ndarray:
+    """
+    The scene at one viewing angle and water clarity as a uint8 RGB image.
+    Pass `traced` to reuse the geometry of an earlier trace(angle).
+    """
+    if traced is None:
+        traced = trace(angle)
+    scatter, blur = TURBIDITY[clarity]
+    colour = traced["colour"]
+    if scatter:
+        kept = np.exp(-scatter * traced["path"])[..., None]
+        colour = colour * kept + MILKY_WATER * (1.0 - kept)
+    if blur:
+        wet = traced["wet"][..., None]
+        colour = np.where(wet, _blur(colour, blur), colour)
+    return encode_srgb(colour)
+
+
+@cache
+def frame_table() -> dict[tuple[int, str], np.ndarray]:
+    """
+    Every angle slider position for every water clarity. Each angle is
+    traced once and shaded for all clarities. Built once per process and
+    shared by all sessions.
+    """
+    table = {}
+    for angle in ANGLES:
+        traced = trace(int(angle))
+        for clarity in CLARITIES:
+            table[(int(angle), clarity)] = render_frame(int(angle), clarity, traced)
+    return table
@@ -0,0 +1,88 @@
+"""
+Shared spectral helpers: wavelength grid, colour matching functions,
+light sources, food dye absorbance and conversion to sRGB.
+"""
+import numpy as np
+
+WAVELENGTHS = np.arange(380.0, 781.0, 5.0)
+
+
+def _lobe(mu: float, sigma_left: float, sigma_right: float) -> np.ndarray:
+    sigma = np.where(WAVELENGTHS < mu, sigma_left, sigma_right)
+    return np.exp(-0.5 * ((WAVELENGTHS - mu) / sigma) ** 2)
+
+
+# CIE 1931 2-degree colour matching functions, multi-lobe fit from
+# Wyman, Sloan and Shirley (2013). Shape (n_wavelengths, 3) for X, Y, Z.
+CMF = np.stack(
+    [
+        1.056 * _lobe(599.8, 37.9, 31.0) + 0.362 * _lobe(442.0, 16.0, 26.7) - 0.065 * _lobe(501.1, 20.4, 26.2),
+        0.821 * _lobe(568.8, 46.9, 40.5) + 0.286 * _lobe(530.9, 16.3, 31.1),
+        1.217 * _lobe(437.0, 11.8, 36.0) + 0.681 * _lobe(459.0, 26.0, 13.8),
+    ],
+    axis=-1,
+)
+
+_XYZ_TO_LINEAR_SRGB = np.array(
+    [
+        [3.2406, -1.5372, -0.4986],
+        [-0.9689, 1.8758, 0.0415],
+        [0.0557, -0.2040, 1.0570],
+    ]
+)
+
+
+def blackbody(temperature: float) -> np.ndarray:
+    """
+    Planck spectrum at `temperature` kelvin, normalised to a peak of 1.
+    """
+    wl = WAVELENGTHS * 1e-9
+    radiance = 1.0 / (wl**5 * (np.exp(1.4388e-2 / (wl * temperature)) - 1.0))
+    return radiance / radiance.max()
+
+
+# A white LED torch, roughly daylight coloured.
+TORCH = blackbody(5500.0)
+
+
+def _band(mu: float, sigma: float) -> np.ndarray:
+    return np.exp(-0.5 * ((WAVELENGTHS - mu) / sigma) ** 2)
+
+
+# Absorbance of common food dyes, normalised to a peak of about 1.
+# Red is Allura Red, Blue is Brilliant Blue FCF, Yellow is Tartrazine and
+# Green is the usual Tartrazine and Brilliant Blue blend.
+DYE_ABSORBANCE = {
+    "Red": _band(504.0, 38.0) + 0.25 * _band(420.0, 30.0),
+    "Blue": _band(630.0, 40.0) + 0.15 * _band(410.0, 25.0),
+    "Green": 0.75 * _band(630.0, 40.0) + 0.7 * _band(427.0, 32.0),
+    "Yellow": _band(427.0, 34.0) + 0.2 * _band(470.0, 20.0),
+}
+DYE_NAMES = list(DYE_ABSORBANCE)
+
+
+def spectrum_to_xyz(spectrum: np.ndarray) -> np.ndarray:
+    """
+    Integrate spectra of shape (..., n_wavelengths) to XYZ of shape (..., 3).
+    """
+    return spectrum @ CMF
+
+
+def xyz_to_linear_srgb(xyz: np.ndarray) -> np.ndarray:
+    return xyz @ _XYZ_TO_LINEAR_SRGB.T
+
+
+def encode_srgb(linear: np.ndarray) -> np.ndarray:
+    """
+    Gamma-encode linear sRGB in [0, 1] to uint8.
+    """
+    linear = np.clip(linear, 0.0, 1.0)
+    encoded = np.where(linear <= 0.0031308, 12.92 * linear, 1.055 * np.power(linear, 1 / 2.4) - 0.055)
+    return np.round(encoded * 255.0).astype(np.uint8)
+
+
+def spectrum_to_rgb(spectrum: np.ndarray, white: np.ndarray = TORCH) -> np.ndarray:
+    """
+    Linear sRGB of spectra, scaled so that `white` has a luminance of 1.
+    """
+    return xyz_to_linear_srgb(spectrum_to_xyz(spectrum) / spectrum_to_xyz(white)[1])
@@ -0,0 +1,85 @@
+"""
+Experiment 5: how warm different coloured materials get under a lamp.
+
+Each material absorbs a share of the lamp's light given by its absorptivity
+spectrum. A thin surface then warms until absorbed light is balanced by heat
+lost to the air:
+
+    C dT/dt = a * I - h * (T - T_air)
+
+which gives T(t) = T_air + (a * I / h) * (1 - exp(-h * t / C)). The closed
+form is evaluated for all materials and all times in one broadcast.
+"""
+from functools import cache
+
+import numpy as np
+
+from lab.simulations.spectra import WAVELENGTHS, blackbody
+
+MATERIALS = ["Black", "White", "Red", "Blue"]
+# Line colours for charts; white is drawn grey so it shows on a white page.
+CHART_COLOURS = ["#222222", "#c8c8c8", "#d62828", "#1d4ed8"]
+CONTEXTS = ["Clothing choices", "Roof material", "Tent material", "School wall paint"]
+
+AIR_TEMPERATURE = 25.0
+
+# The time slider runs from 1 to 10; each step is this many minutes.
+MINUTES_PER_STEP = 2
+TIME_STEPS = np.arange(1, 11)
+
+
+def _edge(centre: float, width: float) -> np.ndarray:
+    # Smooth step from 0 below `centre` to 1 above it.
+    return 1.0 / (1.0 + np.exp(-(WAVELENGTHS - centre) / width))
+
+
+# Share of light absorbed at each wavelength.
+ABSORPTIVITY = np.stack(
+    [
+        np.full_like(WAVELENGTHS, 0.95),
+        0.08 + 0.25 * (1.0 - _edge(410.0, 8.0)),
+        0.88 - 0.72 * _edge(595.0, 12.0),
+        0.2 + 0.7 * _edge(505.0, 12.0) - 0.12 * _edge(680.0, 15.0),
+    ]
+)
+
+# A classroom incandescent lamp or torch.
+LAMP = blackbody(2800.0)
+
+# Light reaching the surface (W/m2), heat capacity per area (J/m2/K) and
+# heat loss coefficient (W/m2/K) for each discussion context.
+CONTEXT_PARAMS = {
+    "Clothing choices": (400.0, 900.0, 14.0),
+    "Roof material": (900.0, 4500.0, 12.0),
+    "Tent material": (450.0, 500.0, 16.0),
+    "School wall paint": (650.0, 30000.0, 10.0),
+}
+
+
+def effective_absorptivity() -> np.ndarray:
+    """
+    Share of the lamp's light each material absorbs, weighted by its spectrum.
+    """
+    return ABSORPTIVITY @ LAMP / LAMP.sum()
+
+
+@cache
+def simulate(context: str, samples: int = 121) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Minutes since the lamp was switched on, and temperatures in degrees C
+    of shape (len(MATERIALS), samples). Memoised per context.
+    """
+    irradiance, capacity, loss = CONTEXT_PARAMS[context]
+    minutes = np.linspace(0.0, TIME_STEPS[-1] * MINUTES_PER_STEP, samples)
+    absorbed = effective_absorptivity()[:, None] * irradiance
+    warming = absorbed / loss * (1.0 - np.exp(-loss * minutes[None, :] * 60.0 / capacity))
+    return minutes, AIR_TEMPERATURE + warming
+
+
+def temperatures_at(context: str, time_step: int) -> dict[str, float]:
+    """
+    Temperature of every material after `time_step` steps of the slider.
+    """
+    minutes, temps = simulate(context)
+    i = int(np.searchsorted(minutes, time_step * MINUTES_PER_STEP))
+    return {material: float(temps[k, i]) for k, material in enumerate(MATERIALS)}
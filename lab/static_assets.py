@@ -0,0 +1,76 @@
+"""
+Images served as static files named by their content.
+
+Rather than pushing image bytes down each session's websocket, the app
+copies every image it shows into static/assets under a name that includes a
+hash of its bytes, and the page refers to it by URL. A file that changes
+gets a new name, so whatever a URL points at never changes, and browsers
+and any caching proxy in the school can keep it for good. Streamlit serves
+the folder (server.enableStaticServing); serve.py adds the far-future
+Cache-Control header that says so.
+"""
+import hashlib
+import threading
+from pathlib import Path
+
+from lab.files import atomic_write, file_signature
+
+# Streamlit serves the static/ folder next to the main script at app/static/.
+STATIC_DIR = Path(__file__).resolve().parent.parent / "static"
+PUBLISH_DIR = STATIC_DIR / "assets"
+# Relative, so the URLs also work when the app is served under a base path.
+URL_PREFIX = "app/static/assets/"
+
+CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+class StaticAssets:
+    """
+    Publishes files and image bytes into the static folder, once each.
+
+    Published files are remembered by path with their mtime and size, so a
+    teacher replacing a file is picked up on the next rerun. Old copies stay
+    on disk for browsers that still have a page referring to them.
+    """
+
+    def __init__(self, out_dir: Path = PUBLISH_DIR):
+        self.out_dir = out_dir
+        self._published: dict[str, tuple[list[int], str, int]] = {}
+        self._lock = threading.Lock()
+
+    def publish(self, path: str | Path, name: str | None = None) -> tuple[str, int] | None:
+        """
+        URL and size in bytes of the file at `path`, or None if it is
+        missing. `name` replaces the file's own name in the URL, which is
+        kept readable for anyone looking at proxy logs.
+        """
+        key = str(path)
+        signature = file_signature(key)
+        if signature is None:
+            return None
+        with self._lock:
+            known = self._published.get(key)
+        if known is not None and known[0] == signature:
+            return known[1], known[2]
+
+        try:
+            data = Path(key).read_bytes()
+        except OSError:
+            return None
+        url = self.publish_bytes(data, Path(key).suffix, name or Path(key).stem)
+        with self._lock:
+            self._published[key] = (signature, url, len(data))
+        return url, len(data)
+
+    def publish_bytes(self, data: bytes, suffix: str, name: str) -> str:
+        """
+        URL for `data`, writing it out if no file has the same content.
+        """
+        filename = f"{name}.{hashlib.sha256(data).hexdigest()[:16]}{suffix}"
+        target = self.out_dir / filename
+        if not target.exists():
+            atomic_write(target, data)
+        return URL_PREFIX + filename
+
+
+STATIC_ASSETS = StaticAssets()
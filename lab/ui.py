@@ -0,0 +1,497 @@
+"""
+Page building blocks shared by every experiment.
+"""
+import html
+import os
+import time
+import uuid
+from pathlib import Path
+
+import streamlit as st
+
+from lab.asset_variants import DEFAULT_QUALITY, VIDEO_TYPES, pick_variant, pick_video
+from lab.broadcast import BROADCAST
+from lab.experiments import (
+    ASSET_COLUMN_WIDTH,
+    find_widget,
+    frozen_inputs,
+    get_experiment,
+    json_blocks,
+    load_registry,
+    run_simulation,
+    scrubbed_slider,
+    step_labels,
+    widget_default,
+)
+from lab.metrics import METRICS, quantile
+from lab.notes_store import NOTES
+from lab.prefetch import PREFETCHER, warm_asset, warm_simulation
+from lab.scrubber import blocks_view, frame_url, scrubber
+from lab.static_assets import STATIC_ASSETS
+
+# Facilitators open the app with ?facilitator=<this key> to see live metrics.
+FACILITATOR_KEY = os.environ.get("LAB_FACILITATOR_KEY", "")
+
+# Registry fields not passed on to a widget: its kind, and the settings for
+# its default, which is put in session state instead.
+WIDGET_DEFAULT_FIELDS = ("kind", "value", "default", "index")
+
+# How often a learner following a broadcast checks it for changes.
+FOLLOW_POLL_SECONDS = 2
+
+# The page's stylesheet, built once per process instead of on every rerun.
+APP_STYLE = f"<style>\n{(Path(__file__).with_name('web') / 'app.css').read_text()}</style>"
+
+
+@METRICS.instrument
+def show_asset(path: str, caption: str | None = None):
+    """
+    Try to show an image or GIF.
+    If file is missing, show a gentle teacher note instead of error.
+    The image is referred to by a content-hashed static URL, so browsers
+    fetch it once and keep it; reruns and tab switches send no image bytes.
+    Animations with built clips are shown as a video that loads on play.
+    If the build stage has made smaller variants, the one matching the
+    column and the chosen image quality is shown instead of the original.
+    Time taken and bytes shown are recorded per asset.
+    """
+    start = time.perf_counter()
+    shown = _send_asset(path, caption)
+    METRICS.observe("lab_asset_seconds", time.perf_counter() - start, asset=path)
+    METRICS.inc("lab_image_bytes_total", shown, asset=path)
+
+
+def _send_asset(path: str, caption: str | None) -> int:
+    quality = st.session_state.get("image_quality", DEFAULT_QUALITY)
+    video = pick_video(path, ASSET_COLUMN_WIDTH, quality)
+    if video is not None:
+        sent = _send_video(path, video, caption)
+        if sent is not None:
+            return sent
+
+    variant = pick_variant(path, ASSET_COLUMN_WIDTH, quality)
+    published = STATIC_ASSETS.publish(variant["path"], Path(path).stem) if variant else None
+    if published is None:
+        # No variant, or its file has gone since the manifest was written.
+        published = STATIC_ASSETS.publish(path, Path(path).stem)
+    if published is None:
+        st.info(
+            f"Teacher note: place a file at `{path}` to show this step visually. "
+            f"PNG, JPG or GIF are supported."
+        )
+        return 0
+
+    url, size = published
+    figcaption = f"<figcaption class='small-note'>{html.escape(caption)}</figcaption>" if caption else ""
+    st.markdown(
+        f'<figure><img src="{url}" alt="{html.escape(caption or "")}" style="width:100%">{figcaption}</figure>',
+        unsafe_allow_html=True,
+    )
+    return size
+
+
+def _send_video(path: str, video: dict, caption: str | None) -> int | None:
+    """
+    An animation as a clip that only loads when the learner presses play;
+    until then the page holds just the poster. Returns the poster's size.
+    """
+    name = Path(path).stem
+    poster = STATIC_ASSETS.publish(video["poster"]["path"], name)
+    sources = [(STATIC_ASSETS.publish(v["path"], name), VIDEO_TYPES[v["format"]]) for v in video["sources"]]
+    if poster is None or any(published is None for published, _ in sources):
+        return None
+
+    figcaption = f"<figcaption class='small-note'>{html.escape(caption)}</figcaption>" if caption else ""
+    tags = "".join(f'<source src="{published[0]}" type="{mime}">' for published, mime in sources)
+    st.markdown(
+        f'<figure><video controls loop muted playsinline preload="none" poster="{poster[0]}" '
+        f'aria-label="{html.escape(caption or "")}" style="width:100%">{tags}</video>{figcaption}</figure>',
+        unsafe_allow_html=True,
+    )
+    return poster[1]
+
+
+def step_tabs(experiment: dict):
+    """
+    An experiment's step tabs, run lazily: only the open tab's body is
+    executed and sent to the browser.
+    Returns the index of the open tab and its container.
+    """
+    # Widgets in closed tabs are not created on this rerun, so Streamlit would
+    # forget their values. Re-assigning them keeps learner choices across tabs.
+    key_prefix = experiment["id"]
+    step_key = f"{key_prefix}_step"
+    for key in list(st.session_state):
+        if isinstance(key, str) and key.startswith(f"{key_prefix}_") and key != step_key:
+            st.session_state[key] = st.session_state[key]
+
+    tabs = st.tabs(step_labels(experiment), key=step_key, on_change="rerun")
+    for i, tab in enumerate(tabs):
+        if tab.open:
+            return i, tab
+    return 0, tabs[0]
+
+
+@METRICS.instrument
+def step_card(step_no: int, title: str, body: str):
+    """
+    Visual container for each step.
+    """
+    with st.container():
+        st.markdown('<div class="lab-card">', unsafe_allow_html=True)
+        st.markdown(
+            f'<span class="step-number">Step {step_no}</span>'
+            f'<span class="step-header">{title}</span>',
+            unsafe_allow_html=True,
+        )
+        st.write(body)
+        st.markdown("</div>", unsafe_allow_html=True)
+
+
+def learner_identity() -> tuple[str, str]:
+    """
+    Classroom code and session id used to save reflection notes.
+    The session id lives in the page URL, so a reconnect or reload
+    finds the same notes again.
+    """
+    if "session" not in st.query_params:
+        st.query_params["session"] = uuid.uuid4().hex[:12]
+    return classroom_code() or "default", st.query_params["session"]
+
+
+def classroom_code() -> str:
+    """
+    The classroom code entered in the sidebar or given in the URL, or an
+    empty string if there is none.
+    """
+    return (st.session_state.get("classroom") or st.query_params.get("classroom") or "").strip()
+
+
+def save_note(key_prefix: str, question_no: int, question: str):
+    classroom, session_id = learner_identity()
+    body = st.session_state.get(f"{key_prefix}_q{question_no}", "")
+    NOTES.save(classroom, session_id, key_prefix, question_no, question, body)
+
+
+@METRICS.instrument
+def reflection_questions(questions: list[str], key_prefix: str):
+    """
+    Simple reflective questions at the end of each experiment.
+    Supports INEE style learning by reflection.
+    Notes are saved in the background and restored after a reconnect.
+    """
+    st.subheader("Reflection and learning")
+    keys = [f"{key_prefix}_q{i}" for i in range(1, len(questions) + 1)]
+    if any(key not in st.session_state for key in keys):
+        saved = NOTES.load(*learner_identity(), key_prefix)
+        for key in keys:
+            if key not in st.session_state and key in saved:
+                st.session_state[key] = saved[key]
+
+    for i, q in enumerate(questions, start=1):
+        st.markdown(f"**Q{i}. {q}**")
+        st.text_area(
+            "Your notes",
+            key=f"{key_prefix}_q{i}",
+            placeholder="Write observations, group feedback or learner comments here.",
+            on_change=save_note,
+            args=(key_prefix, i, q),
+        )
+
+
+def widget_value(key: str):
+    """
+    Current value of a declared widget, or its default if the learner has
+    not reached its step yet.
+    """
+    if key in st.session_state:
+        return st.session_state[key]
+    return widget_default(find_widget(key))
+
+
+def experiment_intro(experiment: dict):
+    """
+    An experiment's title card and materials. Returns the column its steps
+    go in.
+    """
+    st.markdown('<div class="lab-card">', unsafe_allow_html=True)
+    st.markdown(f'<div class="main-title">{experiment["title"]}</div>', unsafe_allow_html=True)
+    st.markdown(
+        f'<div class="subtitle">{experiment["subtitle"]}</div>',
+        unsafe_allow_html=True,
+    )
+    st.markdown("</div>", unsafe_allow_html=True)
+
+    # Virtual lab table: left materials, right live actions
+    col_left, col_right = st.columns([1, 2])
+
+    with col_left:
+        st.markdown('<div class="lab-card">', unsafe_allow_html=True)
+        st.subheader("Materials on the lab table")
+        st.markdown("\n".join(f"- {item}  " for item in experiment["materials"]))
+        st.markdown(
+            f'<p class="small-note">{experiment["materials_note"]}</p>',
+            unsafe_allow_html=True,
+        )
+        st.markdown("</div>", unsafe_allow_html=True)
+    return col_right
+
+
+def render_experiment(experiment: dict):
+    """
+    Lay out one experiment from its registry entry.
+    """
+    METRICS.seen_session(learner_identity()[1])
+    with METRICS.timed("experiment", experiment=experiment["id"]):
+        with experiment_intro(experiment):
+            step_no, tab = step_tabs(experiment)
+            step = experiment["step"][step_no]
+            with tab:
+                step_card(step_no + 1, step["title"], step["body"])
+                show_asset(step["asset"], step["caption"])
+                if "widgets" in step:
+                    simulation_panel(experiment["id"], step_no)
+                else:
+                    publish_view(experiment["id"], step_no, {}, [])
+                    prefetch_next(experiment["id"], step_no)
+
+        reflection_questions(experiment["reflection"], key_prefix=experiment["id"])
+
+
+def render_following(view: dict):
+    """
+    Lay out the experiment a facilitator is broadcasting, for a learner
+    following them. Nothing is simulated here: the step and its results
+    come from the broadcast, and only the reflection notes are the
+    learner's own.
+    """
+    experiment = get_experiment(view["experiment"])
+    METRICS.seen_session(learner_identity()[1])
+    with METRICS.timed("following", experiment=experiment["id"]):
+        with experiment_intro(experiment):
+            followed_step(view)
+            watch_broadcast(classroom_code(), view["version"])
+
+        reflection_questions(experiment["reflection"], key_prefix=experiment["id"])
+
+
+@st.fragment
+def simulation_panel(experiment_id: str, step_no: int):
+    """
+    A step's widgets and the simulation they drive. Runs as a fragment, so
+    moving a slider reruns and re-sends only this panel, not the page.
+    """
+    METRICS.seen_session(learner_identity()[1])
+    with METRICS.timed("simulation_panel", experiment=experiment_id):
+        experiment = get_experiment(experiment_id)
+        step = experiment["step"][step_no]
+        slider = scrubbed_slider(step)
+        values = {}
+        for widget in step["widgets"]:
+            if widget is not slider:
+                # Seeded through session state like every value step_tabs
+                # keeps, so the widget itself is not given a default too.
+                if widget["key"] not in st.session_state:
+                    st.session_state[widget["key"]] = widget_default(widget)
+                kwargs = {k: v for k, v in widget.items() if k not in WIDGET_DEFAULT_FIELDS}
+                values[widget["key"]] = getattr(st, widget["kind"])(**kwargs)
+        shown = []
+        if "simulation" in step:
+            inputs = {key: values[key] if key in values else widget_value(key) for key in step["inputs"]}
+            PREFETCHER.join(("simulation", experiment_id, step_no, frozen_inputs(inputs)))
+            if slider is None:
+                blocks = run_simulation(experiment, step, inputs)
+                show_blocks(blocks)
+                if broadcasting():
+                    shown = json_blocks(blocks, frame_url)
+            else:
+                # Drawn after the other widgets, as it shows the results too.
+                shown = scrubber(experiment, step_no, slider, inputs)
+        settings = {widget["key"]: values.get(widget["key"], widget_value(widget["key"])) for widget in step["widgets"]}
+        publish_view(experiment_id, step_no, settings, shown)
+    prefetch_next(experiment_id, step_no)
+
+
+def prefetch_next(experiment_id: str, step_no: int):
+    """
+    Start warming the step after this one and the first step of the next
+    experiment in the menu, with this learner's current inputs.
+    """
+    experiments = load_registry()
+    index = next(i for i, e in enumerate(experiments) if e["id"] == experiment_id)
+    upcoming = []
+    if step_no + 1 < len(experiments[index]["step"]):
+        upcoming.append((experiments[index], step_no + 1))
+    if index + 1 < len(experiments):
+        upcoming.append((experiments[index + 1], 0))
+
+    quality = st.session_state.get("image_quality", DEFAULT_QUALITY)
+    for experiment, n in upcoming:
+        step = experiment["step"][n]
+        PREFETCHER.submit(("asset", step["asset"], quality), warm_asset, step["asset"], ASSET_COLUMN_WIDTH, quality)
+        if "simulation" in step:
+            inputs = frozen_inputs({key: widget_value(key) for key in step["inputs"]})
+            PREFETCHER.submit(("simulation", experiment["id"], n, inputs), warm_simulation, experiment["id"], n, inputs)
+
+
+def broadcasting() -> bool:
+    return is_facilitator() and bool(classroom_code()) and st.session_state.get("broadcasting", False)
+
+
+def publish_view(experiment_id: str, step_no: int, settings: dict, blocks: list[dict]):
+    """
+    Send a broadcasting facilitator's current step, settings and results
+    to their classroom. Does nothing for anyone else.
+    """
+    if broadcasting():
+        BROADCAST.publish(classroom_code(), experiment_id, step_no, settings, blocks)
+
+
+def _stop_broadcast():
+    if not st.session_state["broadcasting"]:
+        BROADCAST.stop(classroom_code())
+
+
+def broadcast_controls() -> dict | None:
+    """
+    Sidebar switch to broadcast, for facilitators, or to follow the
+    classroom's broadcast, for learners while one is running. Returns the
+    broadcast view if this learner is following it. Both need a classroom
+    code, so nobody takes over the screens of learners who have none.
+    """
+    classroom = classroom_code()
+    if not classroom:
+        if is_facilitator():
+            st.sidebar.caption("Enter a classroom code to broadcast to its learners.")
+        return None
+    if is_facilitator():
+        st.sidebar.toggle(
+            "Broadcast to this classroom",
+            key="broadcasting",
+            on_change=_stop_broadcast,
+            help=f"Learners in classroom {classroom} see your steps and results as you go.",
+        )
+        return None
+    view = BROADCAST.latest(classroom)
+    if view is None:
+        return None
+    following = st.sidebar.toggle(
+        "Follow the facilitator",
+        value=True,
+        key="following",
+        help="Switch off to explore the experiments on your own.",
+    )
+    return view if following else None
+
+
+def _setting(value) -> str:
+    return ", ".join(value) if isinstance(value, list) else str(value)
+
+
+def followed_step(view: dict):
+    """
+    The step a facilitator is broadcasting, with their settings and results.
+    """
+    METRICS.inc("lab_broadcast_views_total")
+    step = get_experiment(view["experiment"])["step"][view["step"]]
+    step_card(view["step"] + 1, step["title"], step["body"])
+    show_asset(step["asset"], step["caption"])
+    if view["inputs"]:
+        st.caption(
+            "Facilitator's settings: "
+            + "; ".join(f"{find_widget(key)['label']}: {_setting(value)}" for key, value in view["inputs"].items())
+        )
+    if view["blocks"]:
+        blocks_view(view["blocks"], key="broadcast_blocks")
+
+
+@st.fragment(run_every=FOLLOW_POLL_SECONDS)
+def watch_broadcast(classroom: str, version: int):
+    """
+    Check every few seconds whether the broadcast has moved on from
+    `version`, and only then rerun the page to show it. Checks that find
+    nothing new draw and send nothing.
+    """
+    view = BROADCAST.latest(classroom)
+    if view is None or view["version"] != version:
+        st.rerun()
+
+
+def show_blocks(blocks: list[dict]):
+    """
+    Draw the blocks a simulation returns.
+    """
+    for block in blocks:
+        kind = block["kind"]
+        if kind == "image":
+            st.image(block["image"], caption=block["caption"], width="stretch")
+        elif kind == "info":
+            st.info(block["text"])
+        elif kind == "success":
+            st.success(block["text"])
+        elif kind == "markdown":
+            st.markdown(block["text"])
+        elif kind == "swatches":
+            for col, item in zip(st.columns(len(block["items"])), block["items"]):
+                col.markdown(
+                    f'<div class="swatch" style="background-color: {item["colour"]}"></div>',
+                    unsafe_allow_html=True,
+                )
+                col.markdown(f'<p class="small-note">{item["label"]}</p>', unsafe_allow_html=True)
+        elif kind == "metrics":
+            for col, item in zip(st.columns(len(block["items"])), block["items"]):
+                col.metric(item["label"], item["value"], item["delta"], delta_color=block["delta_color"])
+        elif kind == "line_chart":
+            data = {block["x_label"]: block["x"], **block["series"]}
+            if "colours" in block:
+                st.line_chart(
+                    data, x=block["x_label"], y=list(block["series"]), color=block["colours"], y_label=block["y_label"]
+                )
+            else:
+                st.line_chart(data, x=block["x_label"], y_label=block["y_label"])
+
+
+def is_facilitator() -> bool:
+    return bool(FACILITATOR_KEY) and st.query_params.get("facilitator") == FACILITATOR_KEY
+
+
+def _ms(seconds: float) -> str:
+    return "over 5000" if seconds == float("inf") else f"{seconds * 1000:.1f}"
+
+
+def metrics_panel():
+    """
+    Live figures from this server process, for facilitators only.
+    Times are per rerun; p95 is the upper edge of its histogram bucket.
+    """
+    snapshot = METRICS.snapshot()
+    counters = snapshot.counters
+    with st.sidebar.expander("Lab metrics"):
+        st.metric("Active sessions", int(counters[("lab_active_sessions", ())]))
+
+        parts, assets = [], []
+        for (name, labels), hist in sorted(snapshot.histograms.items()):
+            labels = dict(labels)
+            runs = sum(hist[:-1])
+            row = {"Runs": runs, "Mean ms": _ms(hist[-1] / runs), "p95 ms": _ms(quantile(hist, 0.95))}
+            if name == "lab_render_seconds":
+                parts.append({"Part": labels["part"], "Experiment": labels["experiment"] or "-", **row})
+            elif name == "lab_asset_seconds":
+                shown = counters.get(("lab_image_bytes_total", (("asset", labels["asset"]),)), 0)
+                assets.append({"Asset": labels["asset"], **row, "kB shown": f"{shown / 1024:.0f}"})
+        st.markdown("**Rendering**")
+        st.table(parts)
+        st.markdown("**Step assets**")
+        st.table(assets)
+
+        lookups = counters[("lab_asset_cache_hits_total", ())] + counters[("lab_asset_cache_misses_total", ())]
+        if lookups:
+            st.caption(
+                f"Asset cache: {counters[('lab_asset_cache_hits_total', ())] / lookups:.0%} hits, "
+                f"{counters[('lab_asset_cache_bytes', ())] / 2**20:.1f} MB mapped."
+            )
+        if counters[("lab_broadcasts_live", ())]:
+            st.caption(
+                f"Broadcasts: {counters[('lab_broadcasts_live', ())]:.0f} live, "
+                f"{counters.get(('lab_broadcast_views_total', ()), 0):.0f} views sent to learners."
+            )
@@ -0,0 +1,147 @@
+// Draws the blocks a simulation returns (see lab/experiments/__init__.py)
+// as plain DOM. Used by the offline page and the slider scrubber component.
+// No dependencies.
+(function () {
+  "use strict";
+
+  var PALETTE = ["#0068c9", "#83c9ff", "#ff2b2b", "#ffabab", "#29b09d", "#7defa1"];
+  var SVG = "http://www.w3.org/2000/svg";
+
+  function el(tag, className, text) {
+    var node = document.createElement(tag);
+    if (className) node.className = className;
+    if (text !== undefined) node.textContent = text;
+    return node;
+  }
+
+  function svg(tag, attrs) {
+    var node = document.createElementNS(SVG, tag);
+    for (var name in attrs) node.setAttribute(name, attrs[name]);
+    return node;
+  }
+
+  // Bold text is the only markdown simulations use.
+  function markdown(text) {
+    var p = el("p");
+    text.split("**").forEach(function (part, i) {
+      p.appendChild(i % 2 ? el("strong", null, part) : document.createTextNode(part));
+    });
+    return p;
+  }
+
+  function niceTicks(lo, hi, count) {
+    var raw = (hi - lo) / count;
+    var magnitude = Math.pow(10, Math.floor(Math.log10(raw)));
+    var step = magnitude * 10;
+    [1, 2, 5].forEach(function (m) {
+      if (m * magnitude >= raw && m * magnitude < step) step = m * magnitude;
+    });
+    var ticks = [];
+    for (var t = Math.ceil(lo / step) * step; t <= hi + step / 1e6; t += step) ticks.push(+t.toFixed(6));
+    return ticks;
+  }
+
+  function lineChart(block) {
+    var W = 640, H = 280, L = 56, R = 12, T = 12, B = 44;
+    var names = Object.keys(block.series);
+    var colours = block.colours || PALETTE;
+    var x = block.x;
+    var lo = Infinity, hi = -Infinity;
+    names.forEach(function (n) {
+      block.series[n].forEach(function (v) { lo = Math.min(lo, v); hi = Math.max(hi, v); });
+    });
+    if (lo === hi) { lo -= 1; hi += 1; }
+    var x0 = x[0], x1 = x[x.length - 1];
+    function px(v) { return L + (v - x0) / (x1 - x0) * (W - L - R); }
+    function py(v) { return T + (hi - v) / (hi - lo) * (H - T - B); }
+
+    var chart = svg("svg", { viewBox: "0 0 " + W + " " + H, class: "chart", role: "img" });
+    niceTicks(lo, hi, 5).forEach(function (t) {
+      chart.appendChild(svg("line", { x1: L, x2: W - R, y1: py(t), y2: py(t), class: "grid" }));
+      var label = svg("text", { x: L - 6, y: py(t) + 4, "text-anchor": "end" });
+      label.textContent = t;
+      chart.appendChild(label);
+    });
+    niceTicks(x0, x1, 6).forEach(function (t) {
+      var label = svg("text", { x: px(t), y: H - B + 16, "text-anchor": "middle" });
+      label.textContent = t;
+      chart.appendChild(label);
+    });
+    names.forEach(function (n, i) {
+      var points = block.series[n].map(function (v, k) { return px(x[k]).toFixed(1) + "," + py(v).toFixed(1); });
+      chart.appendChild(svg("polyline", { points: points.join(" "), fill: "none", stroke: colours[i % colours.length], "stroke-width": 2 }));
+    });
+    var xLabel = svg("text", { x: (L + W - R) / 2, y: H - 6, "text-anchor": "middle", class: "axis-label" });
+    xLabel.textContent = block.x_label;
+    chart.appendChild(xLabel);
+    var yLabel = svg("text", { x: 12, y: (T + H - B) / 2, transform: "rotate(-90 12 " + (T + H - B) / 2 + ")", "text-anchor": "middle", class: "axis-label" });
+    yLabel.textContent = block.y_label;
+    chart.appendChild(yLabel);
+
+    var figure = el("figure", "chart-figure");
+    figure.appendChild(chart);
+    var legend = el("div", "legend");
+    names.forEach(function (n, i) {
+      var key = el("span", "legend-key");
+      key.style.backgroundColor = colours[i % colours.length];
+      var item = el("span", "legend-item");
+      item.appendChild(key);
+      item.appendChild(document.createTextNode(n));
+      legend.appendChild(item);
+    });
+    figure.appendChild(legend);
+    return figure;
+  }
+
+  function columns(items, draw) {
+    var row = el("div", "columns");
+    items.forEach(function (item) {
+      var col = el("div", "column");
+      draw(col, item);
+      row.appendChild(col);
+    });
+    return row;
+  }
+
+  var DRAW = {
+    image: function (b) {
+      var figure = el("figure");
+      var img = el("img");
+      img.src = b.src;
+      img.alt = b.caption;
+      figure.appendChild(img);
+      figure.appendChild(el("figcaption", "small-note", b.caption));
+      return figure;
+    },
+    info: function (b) { return el("div", "alert info", b.text); },
+    success: function (b) { return el("div", "alert success", b.text); },
+    markdown: function (b) { return markdown(b.text); },
+    swatches: function (b) {
+      return columns(b.items, function (col, item) {
+        var swatch = el("div", "swatch");
+        swatch.style.backgroundColor = item.colour;
+        col.appendChild(swatch);
+        col.appendChild(el("p", "small-note", item.label));
+      });
+    },
+    metrics: function (b) {
+      return columns(b.items, function (col, item) {
+        col.appendChild(el("div", "metric-label", item.label));
+        col.appendChild(el("div", "metric-value", item.value));
+        var up = item.delta.charAt(0) !== "-";
+        var good = b.delta_color === "inverse" ? !up : up;
+        col.appendChild(el("div", "metric-delta " + (good ? "good" : "bad"), (up ? "↑ " : "↓ ") + item.delta));
+      });
+    },
+    line_chart: lineChart,
+  };
+
+  // Replace the contents of `container` with the drawn blocks.
+  window.renderBlocks = function (container, blocks) {
+    container.textContent = "";
+    blocks.forEach(function (b) { container.appendChild(DRAW[b.kind](b)); });
+  };
+
+  // The lookup key for a set of input values; matches tools/export_static.py.
+  window.viewKey = function (values) { return JSON.stringify(values); };
+})();
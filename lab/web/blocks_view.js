@@ -0,0 +1,13 @@
+// Plain view of simulation blocks for the app, used for learners following a
+// facilitator's broadcast: the blocks arrive as data and are drawn here, so
+// the server sends the same few kilobytes to every learner and draws nothing.
+// blocks.js is loaded ahead of this module.
+export default function (component) {
+  var root = component.parentElement.querySelector(".blocks-view");
+  if (!root) {
+    root = document.createElement("div");
+    root.className = "blocks-view";
+    component.parentElement.appendChild(root);
+  }
+  renderBlocks(root, component.data.blocks);
+}
@@ -0,0 +1,211 @@
+// The offline lab page: the same experiments, steps and widgets as the app,
+// with every simulation result looked up from window.LAB_DATA (data.js)
+// instead of computed by a server. Reflection notes stay in this browser.
+(function () {
+  "use strict";
+
+  var DATA = window.LAB_DATA;
+  var NOTES_PREFIX = "lab-notes:";
+  var current = { experiment: 0, step: 0 };
+  var values = {};
+
+  function el(tag, className, text) {
+    var node = document.createElement(tag);
+    if (className) node.className = className;
+    if (text !== undefined) node.textContent = text;
+    return node;
+  }
+
+  function card(children) {
+    var node = el("div", "lab-card");
+    children.forEach(function (child) { node.appendChild(child); });
+    return node;
+  }
+
+  function findWidget(experiment, key) {
+    for (var i = 0; i < experiment.steps.length; i++) {
+      var widgets = experiment.steps[i].widgets;
+      for (var k = 0; k < widgets.length; k++) if (widgets[k].key === key) return widgets[k];
+    }
+  }
+
+  function resetValues(experiment) {
+    values = {};
+    experiment.steps.forEach(function (step) {
+      step.widgets.forEach(function (w) { values[w.key] = w.default; });
+    });
+  }
+
+  function drawView(step, container) {
+    var key = viewKey(step.inputs.map(function (k) { return values[k]; }));
+    renderBlocks(container, step.views[key] || []);
+  }
+
+  function widget(w, onChange) {
+    var box = el("div", "widget");
+    box.appendChild(el("label", "widget-label", w.label));
+    if (w.kind === "selectbox") {
+      var select = el("select");
+      w.options.forEach(function (option) {
+        var o = el("option", null, option);
+        o.value = option;
+        o.selected = option === values[w.key];
+        select.appendChild(o);
+      });
+      select.onchange = function () { values[w.key] = select.value; onChange(); };
+      box.appendChild(select);
+    } else if (w.kind === "slider") {
+      var row = el("div", "slider-row");
+      var range = el("input");
+      range.type = "range";
+      range.min = w.min_value;
+      range.max = w.max_value;
+      range.step = w.step || 1;
+      range.value = values[w.key];
+      var shown = el("span", "slider-value", String(values[w.key]));
+      range.oninput = function () {
+        values[w.key] = parseInt(range.value, 10);
+        shown.textContent = range.value;
+        onChange();
+      };
+      row.appendChild(range);
+      row.appendChild(shown);
+      box.appendChild(row);
+    } else if (w.kind === "multiselect") {
+      var boxes = [];
+      var sync = function () {
+        boxes.forEach(function (b) {
+          b.checked = values[w.key].indexOf(b.value) >= 0;
+          b.disabled = !b.checked && values[w.key].length >= (w.max_selections || w.options.length);
+        });
+      };
+      w.options.forEach(function (option) {
+        var label = el("label", "choice");
+        var b = el("input");
+        b.type = "checkbox";
+        b.value = option;
+        // Keep the order of picking, as the app does.
+        b.onchange = function () {
+          var chosen = values[w.key].filter(function (v) { return v !== option; });
+          if (b.checked) chosen.push(option);
+          values[w.key] = chosen;
+          sync();
+          onChange();
+        };
+        boxes.push(b);
+        label.appendChild(b);
+        label.appendChild(document.createTextNode(" " + option));
+        box.appendChild(label);
+      });
+      sync();
+    }
+    return box;
+  }
+
+  function drawStep(experiment, container) {
+    var step = experiment.steps[current.step];
+    container.textContent = "";
+    var header = el("div");
+    header.appendChild(el("span", "step-number", "Step " + (current.step + 1)));
+    header.appendChild(el("span", "step-header", step.title));
+    container.appendChild(card([header, el("p", null, step.body)]));
+    if (step.asset) {
+      var figure = el("figure");
+      var img = el("img");
+      img.src = step.asset;
+      img.alt = step.caption;
+      img.loading = "lazy";
+      figure.appendChild(img);
+      figure.appendChild(el("figcaption", "small-note", step.caption));
+      container.appendChild(figure);
+    }
+    if (step.inputs.length) {
+      var view = el("div", "view");
+      step.widgets.forEach(function (w) {
+        container.appendChild(widget(w, function () { drawView(step, view); }));
+      });
+      container.appendChild(view);
+      drawView(step, view);
+    }
+  }
+
+  function drawReflection(experiment, container) {
+    container.appendChild(el("h2", null, "Reflection and learning"));
+    experiment.reflection.forEach(function (question, i) {
+      var key = NOTES_PREFIX + experiment.id + "_q" + (i + 1);
+      container.appendChild(el("p", "question", "Q" + (i + 1) + ". " + question));
+      var area = el("textarea");
+      area.placeholder = "Write observations, group feedback or learner comments here.";
+      area.value = localStorage.getItem(key) || "";
+      area.oninput = function () { localStorage.setItem(key, area.value); };
+      container.appendChild(area);
+    });
+    var download = el("button", "download", "Download notes");
+    download.onclick = function () {
+      var lines = [];
+      experiment.reflection.forEach(function (question, i) {
+        lines.push("Q" + (i + 1) + ". " + question, localStorage.getItem(NOTES_PREFIX + experiment.id + "_q" + (i + 1)) || "", "");
+      });
+      var link = el("a");
+      link.href = URL.createObjectURL(new Blob([lines.join("\n")], { type: "text/plain" }));
+      link.download = experiment.id + "-notes.txt";
+      link.click();
+    };
+    container.appendChild(download);
+  }
+
+  function drawExperiment() {
+    var experiment = DATA.experiments[current.experiment];
+    var main = document.getElementById("experiment");
+    main.textContent = "";
+    main.appendChild(card([el("div", "main-title", experiment.title), el("div", "subtitle", experiment.subtitle)]));
+
+    // Virtual lab table: left materials, right live actions
+    var table = el("div", "lab-table");
+    var materials = el("ul");
+    experiment.materials.forEach(function (item) { materials.appendChild(el("li", null, item)); });
+    table.appendChild(card([el("h3", null, "Materials on the lab table"), materials, el("p", "small-note", experiment.materials_note)]));
+
+    var right = el("div");
+    var tabs = el("div", "tabs");
+    var body = el("div");
+    experiment.steps.forEach(function (step, i) {
+      var tab = el("button", i === current.step ? "tab open" : "tab", step.label);
+      tab.onclick = function () {
+        current.step = i;
+        Array.prototype.forEach.call(tabs.children, function (t, k) { t.className = k === i ? "tab open" : "tab"; });
+        drawStep(experiment, body);
+      };
+      tabs.appendChild(tab);
+    });
+    right.appendChild(tabs);
+    right.appendChild(body);
+    table.appendChild(right);
+    main.appendChild(table);
+    drawStep(experiment, body);
+    drawReflection(experiment, main);
+  }
+
+  function drawMenu() {
+    var menu = document.getElementById("menu");
+    DATA.experiments.forEach(function (experiment, i) {
+      var label = el("label", "choice");
+      var radio = el("input");
+      radio.type = "radio";
+      radio.name = "experiment";
+      radio.checked = i === current.experiment;
+      radio.onchange = function () {
+        current = { experiment: i, step: 0 };
+        resetValues(experiment);
+        drawExperiment();
+      };
+      label.appendChild(radio);
+      label.appendChild(document.createTextNode(" " + experiment.title));
+      menu.appendChild(label);
+    });
+  }
+
+  drawMenu();
+  resetValues(DATA.experiments[0]);
+  drawExperiment();
+})();
@@ -0,0 +1,41 @@
+// Slider scrubber component for the app. Receives every result of a step's
+// slider at once and redraws them in the browser while the slider moves; the
+// chosen value is only sent back to Python when the slider is released.
+// blocks.js is loaded ahead of this module.
+export default function (component) {
+  var data = component.data;
+  var root = component.parentElement.querySelector(".scrubber");
+  if (!root) {
+    root = document.createElement("div");
+    root.className = "scrubber";
+    root.innerHTML =
+      '<label class="scrubber-label"></label>' +
+      '<div class="scrubber-row"><input type="range"><span class="scrubber-value"></span></div>' +
+      '<div class="scrubber-view"></div>';
+    component.parentElement.appendChild(root);
+  }
+  var range = root.querySelector("input");
+  var shown = root.querySelector(".scrubber-value");
+  var view = root.querySelector(".scrubber-view");
+
+  root.querySelector(".scrubber-label").textContent = data.label;
+  range.min = data.min;
+  range.max = data.max;
+  range.step = data.step;
+  range.value = data.value;
+
+  function draw() {
+    var position = Math.round((range.value - data.min) / data.step);
+    shown.textContent = range.value;
+    renderBlocks(view, data.views[position]);
+  }
+  // Frames are static URLs; fetch them all now so the first drag is smooth.
+  data.views.forEach(function (blocks) {
+    blocks.forEach(function (block) {
+      if (block.src) new Image().src = block.src;
+    });
+  });
+  range.oninput = draw;
+  range.onchange = function () { component.setStateValue("value", parseInt(range.value, 10)); };
+  draw();
+}
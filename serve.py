@@ -0,0 +1,55 @@
+"""
+Production entry point: the lab app with long-lived caching of its images.
+
+    streamlit run serve.py
+
+Runs app.py as usual. Images under app/static/assets/ are named by their
+content, so they are sent with a far-future immutable Cache-Control header;
+browsers and school proxies then never ask for them again. `streamlit run
+app.py` still works, but browsers re-check each image with the server.
+
+It also serves the lab metrics at /metrics in Prometheus text format, for a
+scraper to pull alongside the file lab.metrics writes.
+"""
+import streamlit as st
+from starlette.middleware import Middleware
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+from lab.metrics import METRICS
+from lab.static_assets import CACHE_CONTROL, URL_PREFIX
+
+# Prometheus text exposition format.
+METRICS_MEDIA_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class ImmutableAssets:
+    """
+    ASGI middleware adding CACHE_CONTROL to successful static asset responses.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or f"/{URL_PREFIX}" not in scope["path"]:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_header(message):
+            if message["type"] == "http.response.start" and message["status"] == 200:
+                headers = [(k, v) for k, v in message.get("headers", []) if k.lower() != b"cache-control"]
+                headers.append((b"cache-control", CACHE_CONTROL.encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        await self.app(scope, receive, send_with_header)
+
+
+def metrics(request):
+    # Not async: Starlette runs it on a worker thread, so adding up the
+    # shards never holds up the event loop.
+    return PlainTextResponse(METRICS.render_prometheus(), media_type=METRICS_MEDIA_TYPE)
+
+
+app = st.App("app.py", routes=[Route("/metrics", metrics)], middleware=[Middleware(ImmutableAssets)])
@@ -0,0 +1,61 @@
+import sqlite3
+import time
+
+import pytest
+
+import lab.notes_store as notes_store
+from lab.notes_store import NotesStore
+
+
+def _saved(path) -> list[tuple]:
+    if not path.exists():
+        return []
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute("SELECT note_key, body FROM notes").fetchall()
+    except sqlite3.Error:
+        return []
+    finally:
+        conn.close()
+
+
+def _wait_for(predicate, timeout: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_notes_are_saved_after_the_database_fails_to_open(tmp_path, monkeypatch):
+    real_connect = notes_store.connect
+    failures = []
+
+    def flaky_connect(path):
+        if len(failures) < 2:
+            failures.append(path)
+            raise sqlite3.OperationalError("unable to open database file")
+        return real_connect(path)
+
+    monkeypatch.setattr(notes_store, "connect", flaky_connect)
+    store = NotesStore(tmp_path / "notes.sqlite3", debounce_seconds=0.01)
+    store.save("c1", "s1", "exp3", 1, "Why?", "Because")
+
+    assert _wait_for(lambda: _saved(store.path) == [("exp3_q1", "Because")])
+    assert len(failures) == 2
+
+
+@pytest.mark.filterwarnings("ignore::pytest.PytestUnhandledThreadExceptionWarning")
+def test_writer_restarts_after_its_thread_exits(tmp_path, monkeypatch):
+    def stop():
+        raise KeyboardInterrupt
+
+    store = NotesStore(tmp_path / "notes.sqlite3", debounce_seconds=0.01)
+    monkeypatch.setattr(store, "_take_pending", stop)
+    store.save("c1", "s1", "exp3", 1, "Why?", "First")
+    assert _wait_for(lambda: store._writer is None)
+
+    monkeypatch.undo()
+    store.save("c1", "s1", "exp3", 1, "Why?", "Second")
+    assert _wait_for(lambda: _saved(store.path) == [("exp3_q1", "Second")])
@@ -0,0 +1,3 @@
+"""
+Offline command line tools for preparing and maintaining the lab.
+"""
@@ -0,0 +1,250 @@
+"""
+Headless load and latency benchmark for the lab app.
+
+Drives app.py through Streamlit's AppTest with scripted learner journeys
+taken from the experiment registry. Each journey opens every experiment
+from the sidebar and visits every step. On each step it moves every widget
+across its range, then fills in the reflection notes. N sessions run at
+once, each in its own process, so they compete for the CPU as sessions on
+a busy server do.
+
+    python -m tools.benchmark [--sessions N] [--update-baseline]
+
+Reports p50/p95 rerun latency and the delta count (elements sent) per
+experiment, and the memory each session adds. Exits non-zero if any figure
+regresses past tools/benchmark_baseline.json by more than the tolerance.
+AppTest always reruns the whole script, so latencies are full reruns even
+where the browser would only rerun a fragment.
+
+Baselines depend on the machine. Refresh them with --update-baseline on
+the machine that runs the check.
+"""
+import argparse
+import gc
+import json
+import multiprocessing
+import os
+import resource
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+APP_PATH = ROOT / "app.py"
+BASELINE_PATH = Path(__file__).with_name("benchmark_baseline.json")
+DEFAULT_SESSIONS = 4
+DEFAULT_TOLERANCE = 0.25
+# Latency may also drift by this much, so scheduling noise on fast reruns
+# does not fail the check.
+LATENCY_SLACK_MS = 25.0
+# Resident memory moves by several MB from one journey to the next as the
+# allocator keeps or returns freed pages, so memory gets the same allowance.
+MEMORY_SLACK_MB = 16.0
+
+
+def tree_size(node) -> int:
+    """
+    Elements and blocks in a rendered tree; one delta is sent for each.
+    """
+    return 1 + sum(tree_size(child) for child in getattr(node, "children", {}).values())
+
+
+def _rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        # Peak rather than current size, but still shows growth.
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def journey(session_id: str, timeout: float) -> tuple[object, dict[str, dict[str, list]]]:
+    """
+    One learner session through every experiment. Returns the AppTest,
+    kept so its session stays in memory until measured, and the latency
+    (ms) and delta count of each rerun, grouped by experiment.
+    """
+    from streamlit.testing.v1 import AppTest
+
+    from lab.experiments import load_registry, scrubbed_slider, step_labels, widget_choices
+
+    at = AppTest.from_file(str(APP_PATH), default_timeout=timeout)
+    at.query_params["session"] = session_id
+    results = {}
+
+    def rerun(experiment_id: str, step_label: str):
+        # Tabs fall back to their default after another widget changes in
+        # AppTest, so the open step is set again before every run.
+        at.session_state[f"{experiment_id}_step"] = step_label
+        start = time.perf_counter()
+        at.run()
+        elapsed = (time.perf_counter() - start) * 1000
+        if at.exception:
+            raise RuntimeError(f"{experiment_id}, {step_label}: {at.exception[0].message}")
+        results[experiment_id]["latency_ms"].append(elapsed)
+        results[experiment_id]["deltas"].append(tree_size(at._tree))
+
+    at.run()
+    for experiment in load_registry():
+        experiment_id = experiment["id"]
+        results[experiment_id] = {"latency_ms": [], "deltas": []}
+        at.sidebar.radio[0].set_value(experiment["title"])
+        labels = step_labels(experiment)
+        rerun(experiment_id, labels[0])
+
+        for step, label in zip(experiment["step"], labels):
+            rerun(experiment_id, label)
+            scrubbed = scrubbed_slider(step)
+            for widget in step.get("widgets", []):
+                for value in widget_choices(widget):
+                    if widget is scrubbed:
+                        # Drawn by the scrubber component, which AppTest cannot
+                        # drive; set the value it would send on release.
+                        at.session_state[widget["key"]] = value
+                    else:
+                        getattr(at, widget["kind"])(key=widget["key"]).set_value(value)
+                    rerun(experiment_id, label)
+
+        for i, question in enumerate(experiment["reflection"], start=1):
+            at.text_area(key=f"{experiment_id}_q{i}").input(f"Benchmark note from {session_id}: {question}")
+            rerun(experiment_id, labels[-1])
+    return at, results
+
+
+_start_barrier = None
+
+
+def _init_worker(barrier):
+    global _start_barrier
+    _start_barrier = barrier
+
+
+def session_worker(session_no: int, timeout: float) -> tuple[dict[str, dict[str, list]], int]:
+    """
+    Warm up with one unmeasured journey, so imports and simulation tables
+    are built, then wait for the other sessions and run the measured one.
+    Returns its figures and the memory it added.
+    """
+    journey(f"warmup{session_no:03d}", timeout)
+    _start_barrier.wait()
+    # Collect first, so the figure is what the session keeps rather than
+    # garbage from its reruns that has not been freed yet.
+    gc.collect()
+    rss_before = _rss_bytes()
+    at, results = journey(f"bench{session_no:03d}", timeout)
+    gc.collect()
+    return results, _rss_bytes() - rss_before
+
+
+def run_sessions(sessions: int, timeout: float) -> dict:
+    """
+    Run `sessions` journeys at once and summarise them. AppTest keeps
+    global state while a script runs, so each session gets a process.
+    """
+    barrier = multiprocessing.Barrier(sessions)
+    with ProcessPoolExecutor(max_workers=sessions, initializer=_init_worker, initargs=(barrier,)) as pool:
+        finished = list(pool.map(session_worker, range(sessions), [timeout] * sessions))
+
+    merged: dict[str, dict[str, list]] = {}
+    for results, _ in finished:
+        for experiment_id, figures in results.items():
+            into = merged.setdefault(experiment_id, {"latency_ms": [], "deltas": []})
+            into["latency_ms"] += figures["latency_ms"]
+            into["deltas"] += figures["deltas"]
+
+    summary = {"sessions": sessions, "experiments": {}}
+    for experiment_id, figures in merged.items():
+        latencies = figures["latency_ms"]
+        summary["experiments"][experiment_id] = {
+            "reruns": len(latencies),
+            "p50_ms": round(statistics.median(latencies), 1),
+            "p95_ms": round(statistics.quantiles(latencies, n=20)[-1], 1),
+            "max_deltas": max(figures["deltas"]),
+        }
+    added = [rss for _, rss in finished]
+    summary["memory_mb_per_session"] = round(max(added) / 2**20, 1)
+    return summary
+
+
+def compare(summary: dict, baseline: dict, tolerance: float) -> list[str]:
+    """
+    Figures that regressed past the baseline. Latency and memory may grow by
+    `tolerance`, and by LATENCY_SLACK_MS and MEMORY_SLACK_MB; delta counts
+    may not grow at all.
+    """
+    regressions = []
+    for experiment_id, base in baseline.get("experiments", {}).items():
+        now = summary["experiments"].get(experiment_id)
+        if now is None:
+            continue
+        for figure in ("p50_ms", "p95_ms"):
+            if now[figure] > base[figure] * (1 + tolerance) + LATENCY_SLACK_MS:
+                regressions.append(f"{experiment_id} {figure}: {now[figure]} > baseline {base[figure]}")
+        if now["max_deltas"] > base["max_deltas"]:
+            regressions.append(f"{experiment_id} max_deltas: {now['max_deltas']} > baseline {base['max_deltas']}")
+    base_memory = baseline.get("memory_mb_per_session")
+    if base_memory is not None and summary["memory_mb_per_session"] > base_memory * (1 + tolerance) + MEMORY_SLACK_MB:
+        regressions.append(
+            f"memory_mb_per_session: {summary['memory_mb_per_session']} > baseline {base_memory}"
+        )
+    return regressions
+
+
+def print_summary(summary: dict):
+    print(f"{summary['sessions']} concurrent session(s)")
+    print(f"{'experiment':<12}{'reruns':>8}{'p50 ms':>9}{'p95 ms':>9}{'deltas':>8}")
+    for experiment_id, figures in summary["experiments"].items():
+        print(
+            f"{experiment_id:<12}{figures['reruns']:>8}{figures['p50_ms']:>9.1f}"
+            f"{figures['p95_ms']:>9.1f}{figures['max_deltas']:>8}"
+        )
+    print(f"memory per session: {summary['memory_mb_per_session']:.1f} MB")
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--sessions", type=int, help=f"concurrent learner sessions (default: as in the baseline, else {DEFAULT_SESSIONS})"
+    )
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH, help="baseline file to check against")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="allowed growth, 0.25 = 25%%")
+    parser.add_argument("--timeout", type=float, default=30.0, help="seconds allowed for one rerun")
+    parser.add_argument("--update-baseline", action="store_true", help="write the results as the new baseline")
+    args = parser.parse_args(argv)
+
+    # AppTest resolves assets relative to the working directory, and the
+    # benchmark's notes must not end up in the real notes database.
+    os.chdir(ROOT)
+    sys.path.insert(0, str(ROOT))
+    notes_dir = tempfile.TemporaryDirectory()
+    os.environ["LAB_NOTES_DB"] = str(Path(notes_dir.name) / "notes.sqlite3")
+
+    baseline = json.loads(args.baseline.read_text()) if args.baseline.exists() else None
+    if args.sessions is None:
+        args.sessions = baseline["sessions"] if baseline else DEFAULT_SESSIONS
+
+    summary = run_sessions(args.sessions, args.timeout)
+    print_summary(summary)
+
+    if args.update_baseline:
+        args.baseline.write_text(json.dumps(summary, indent=2) + "\n")
+        print(f"Baseline written to {args.baseline}")
+        return
+    if baseline is None:
+        print(f"No baseline at {args.baseline}; run with --update-baseline first.")
+        return
+    if baseline["sessions"] != args.sessions:
+        print(f"Note: the baseline was taken with {baseline['sessions']} sessions, not {args.sessions}.")
+    regressions = compare(summary, baseline, args.tolerance)
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    if regressions:
+        sys.exit(1)
+    print("No regressions against the baseline.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,256 @@
+"""
+Build stage for experiment images and GIFs.
+
+Transcodes every asset in assets/images and assets/gif into several widths,
+as WebP and as a palette-reduced PNG (or GIF for animations), for each
+quality level, and writes assets/build/manifest.json for show_asset.
+Animations also get WebM and MP4 clips with a poster frame when ffmpeg is
+on the PATH.
+
+    python -m tools.build_assets [--force]
+
+Unchanged sources are skipped unless --force is given.
+"""
+import argparse
+import json
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+from PIL import Image, ImageSequence
+
+from lab.asset_variants import (
+    BUILD_DIR,
+    MANIFEST_PATH,
+    QUALITY_LEVELS,
+    SOURCE_DIRS,
+    SOURCE_PATTERNS,
+    VARIANT_WIDTHS,
+)
+from lab.files import atomic_write, file_signature
+
+FFMPEG = shutil.which("ffmpeg")
+
+
+def find_sources() -> list[Path]:
+    sources = set()
+    for folder in SOURCE_DIRS:
+        for pattern in SOURCE_PATTERNS:
+            sources.update(Path(folder).glob(pattern))
+    return sorted(sources)
+
+
+def target_widths(width: int) -> list[int]:
+    """
+    Variant widths for a source, never upscaling. A source narrower than
+    the smallest width is kept at its own width.
+    """
+    widths = [w for w in VARIANT_WIDTHS if w < width]
+    widths.append(min(width, VARIANT_WIDTHS[-1]))
+    return sorted(set(widths))
+
+
+def _resize(img: Image.Image, width: int) -> Image.Image:
+    height = max(1, round(img.height * width / img.width))
+    return img.resize((width, height), Image.LANCZOS)
+
+
+def _write_still(img: Image.Image, out_dir: Path, quality: str, width: int) -> list[tuple[Path, str]]:
+    settings = QUALITY_LEVELS[quality]
+    has_alpha = img.mode in ("RGBA", "LA") or "transparency" in img.info
+    frame = _resize(img.convert("RGBA" if has_alpha else "RGB"), width)
+
+    webp_path = out_dir / f"{quality}-{width}w.webp"
+    frame.save(webp_path, "WEBP", quality=settings["webp_quality"], method=6)
+
+    png_path = out_dir / f"{quality}-{width}w.png"
+    method = Image.Quantize.FASTOCTREE if has_alpha else Image.Quantize.MEDIANCUT
+    frame.quantize(colors=settings["colours"], method=method).save(png_path, "PNG", optimize=True)
+
+    return [(webp_path, "webp"), (png_path, "png")]
+
+
+def _write_animation(img: Image.Image, out_dir: Path, quality: str, width: int) -> list[tuple[Path, str]]:
+    settings = QUALITY_LEVELS[quality]
+    frames, durations = [], []
+    for frame in ImageSequence.Iterator(img):
+        frames.append(_resize(frame.convert("RGB"), width))
+        durations.append(frame.info.get("duration", 100))
+    loop = img.info.get("loop", 0)
+
+    webp_path = out_dir / f"{quality}-{width}w.webp"
+    frames[0].save(
+        webp_path,
+        "WEBP",
+        save_all=True,
+        append_images=frames[1:],
+        duration=durations,
+        loop=loop,
+        quality=settings["webp_quality"],
+        method=4,
+    )
+
+    gif_path = out_dir / f"{quality}-{width}w.gif"
+    palette = [f.quantize(colors=settings["colours"], method=Image.Quantize.MEDIANCUT) for f in frames]
+    palette[0].save(
+        gif_path,
+        "GIF",
+        save_all=True,
+        append_images=palette[1:],
+        duration=durations,
+        loop=loop,
+        optimize=True,
+    )
+
+    return [(webp_path, "webp"), (gif_path, "gif")]
+
+
+def _write_video(source: Path, img: Image.Image, out_dir: Path, quality: str, width: int) -> list[tuple[Path, str]]:
+    """
+    Looping clips of an animation and a poster of its first frame. Clips
+    are far smaller than GIFs; without ffmpeg there are none.
+    """
+    if FFMPEG is None:
+        return []
+    settings = QUALITY_LEVELS[quality]
+    img.seek(0)
+    poster_path = out_dir / f"{quality}-{width}w-poster.webp"
+    _resize(img.convert("RGB"), width).save(poster_path, "WEBP", quality=settings["webp_quality"], method=6)
+
+    codecs = {
+        "webm": ["-c:v", "libvpx-vp9", "-crf", str(settings["vp9_crf"]), "-b:v", "0", "-row-mt", "1"],
+        # faststart puts the index first, so playback starts before the clip has loaded.
+        "mp4": ["-c:v", "libx264", "-crf", str(settings["h264_crf"]), "-preset", "slow", "-movflags", "+faststart"],
+    }
+    outputs = [(poster_path, "poster")]
+    for fmt, codec in codecs.items():
+        path = out_dir / f"{quality}-{width}w.{fmt}"
+        # 4:2:0 video needs even dimensions.
+        scale = f"scale={width - width % 2}:-2:flags=lanczos"
+        subprocess.run(
+            [FFMPEG, "-v", "error", "-y", "-i", str(source), "-vf", scale, "-an", "-pix_fmt", "yuv420p", *codec, str(path)],
+            check=True,
+        )
+        outputs.append((path, fmt))
+    return outputs
+
+
+def build_one(source: Path) -> dict:
+    """
+    Write all variants for one source and return its manifest entry. They
+    are written to a folder alongside and swapped in once all of them are
+    done, so a failed build leaves the previous variants where they were.
+    """
+    out_dir = BUILD_DIR / source.parent.name / source.stem
+    staging = out_dir.with_name(f".{out_dir.name}.building")
+    shutil.rmtree(staging, ignore_errors=True)
+    staging.mkdir(parents=True)
+    try:
+        entry = _write_variants(source, staging)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    previous = out_dir.with_name(f".{out_dir.name}.previous")
+    shutil.rmtree(previous, ignore_errors=True)
+    if out_dir.exists():
+        out_dir.rename(previous)
+    staging.rename(out_dir)
+    shutil.rmtree(previous, ignore_errors=True)
+    for variant in entry["variants"]:
+        variant["path"] = (out_dir / Path(variant["path"]).name).as_posix()
+    return entry
+
+
+def _write_variants(source: Path, out_dir: Path) -> dict:
+    signature = file_signature(source)
+    with Image.open(source) as img:
+        animated = getattr(img, "is_animated", False)
+        writer = _write_animation if animated else _write_still
+        variants = []
+        for quality in QUALITY_LEVELS:
+            for width in target_widths(img.width):
+                outputs = writer(img, out_dir, quality, width)
+                if animated:
+                    outputs += _write_video(source, img, out_dir, quality, width)
+                for path, fmt in outputs:
+                    variants.append(
+                        {
+                            "path": path.as_posix(),
+                            "format": fmt,
+                            "quality": quality,
+                            "width": width,
+                            "bytes": path.stat().st_size,
+                        }
+                    )
+        return {
+            "signature": signature,
+            "width": img.width,
+            "height": img.height,
+            "animated": animated,
+            "variants": variants,
+        }
+
+
+def load_existing() -> dict:
+    try:
+        return json.loads(MANIFEST_PATH.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def write_manifest(manifest: dict):
+    atomic_write(MANIFEST_PATH, json.dumps(manifest, indent=2, sort_keys=True))
+
+
+def up_to_date(entry: dict | None, source: Path) -> bool:
+    if entry is None:
+        return False
+    if entry["signature"] != file_signature(source):
+        return False
+    # Animations built before ffmpeg was installed get their clips now.
+    if entry["animated"] and FFMPEG and not any(v["format"] == "mp4" for v in entry["variants"]):
+        return False
+    return all(Path(v["path"]).exists() for v in entry["variants"])
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--force", action="store_true", help="rebuild every asset")
+    args = parser.parse_args(argv)
+    if FFMPEG is None:
+        print("ffmpeg not found: animations get image variants only, no video clips.")
+
+    existing = load_existing()
+    old = {} if args.force else existing
+    manifest, failed = {}, []
+    for source in find_sources():
+        key = source.as_posix()
+        if up_to_date(old.get(key), source):
+            manifest[key] = old[key]
+            continue
+        try:
+            entry = build_one(source)
+        except Exception as error:
+            # One unreadable file or failed ffmpeg run must not cost every
+            # other asset its variants; the last good build is kept.
+            failed.append(key)
+            kept = key in existing
+            if kept:
+                manifest[key] = existing[key]
+            print(f"{key}: FAILED ({error}){'; keeping the previous variants' if kept else ''}")
+            continue
+        manifest[key] = entry
+        smallest = min(v["bytes"] for v in entry["variants"])
+        print(f"{key}: {len(entry['variants'])} variants, smallest {smallest / 1024:.0f} KiB")
+
+    write_manifest(manifest)
+    print(f"Wrote {MANIFEST_PATH} with {len(manifest)} assets.")
+    if failed:
+        print(f"{len(failed)} asset(s) failed to build.")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Export reflection notes collected across all sessions.
+
+    python -m tools.export_notes --format csv --prefix exp3 --since 2026-01-01 -o notes.csv
+
+Rows are streamed from the database in batches, so memory use stays the
+same whatever the number of notes. Parquet output needs pyarrow.
+"""
+import argparse
+import csv
+import json
+import sqlite3
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+from lab.notes_store import DEFAULT_DB_PATH, EXPORT_COLUMNS, iter_notes
+
+TIME_COLUMN = EXPORT_COLUMNS.index("updated_at")
+
+
+def _timestamp(day: str) -> float:
+    return datetime.fromisoformat(day).replace(tzinfo=timezone.utc).timestamp()
+
+
+def _iso(ts: float) -> str:
+    return datetime.fromtimestamp(ts, timezone.utc).isoformat(timespec="seconds")
+
+
+def _with_iso_time(rows):
+    for row in rows:
+        row = list(row)
+        row[TIME_COLUMN] = _iso(row[TIME_COLUMN])
+        yield row
+
+
+def write_csv(batches, out) -> int:
+    writer = csv.writer(out)
+    writer.writerow(EXPORT_COLUMNS)
+    count = 0
+    for rows in batches:
+        writer.writerows(_with_iso_time(rows))
+        count += len(rows)
+    return count
+
+
+def write_jsonl(batches, out) -> int:
+    count = 0
+    for rows in batches:
+        for row in _with_iso_time(rows):
+            out.write(json.dumps(dict(zip(EXPORT_COLUMNS, row)), ensure_ascii=False))
+            out.write("\n")
+        count += len(rows)
+    return count
+
+
+def write_parquet(batches, path: Path) -> int:
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        sys.exit("Parquet export needs pyarrow: pip install pyarrow")
+
+    schema = pa.schema(
+        [
+            ("classroom", pa.string()),
+            ("session_id", pa.string()),
+            ("key_prefix", pa.string()),
+            ("question_no", pa.int32()),
+            ("question", pa.string()),
+            ("body", pa.string()),
+            ("updated_at", pa.timestamp("s", tz="UTC")),
+        ]
+    )
+    count = 0
+    with pq.ParquetWriter(path, schema) as writer:
+        for rows in batches:
+            columns = list(zip(*rows))
+            # Parquet timestamps take whole seconds.
+            columns[TIME_COLUMN] = [int(ts) for ts in columns[TIME_COLUMN]]
+            writer.write_batch(pa.record_batch(columns, schema=schema))
+            count += len(rows)
+    return count
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--db", default=DEFAULT_DB_PATH, help=f"notes database (default {DEFAULT_DB_PATH})")
+    parser.add_argument("--format", choices=("csv", "jsonl", "parquet"), default="csv")
+    parser.add_argument("--prefix", action="append", help="experiment prefix such as exp3; repeat for several")
+    parser.add_argument("--classroom", help="only notes from this classroom code")
+    parser.add_argument("--since", help="first day to include, YYYY-MM-DD (UTC)")
+    parser.add_argument("--until", help="first day to leave out, YYYY-MM-DD (UTC)")
+    parser.add_argument("-o", "--output", help="output file; CSV and JSON Lines default to stdout")
+    args = parser.parse_args(argv)
+
+    if args.format == "parquet" and not args.output:
+        parser.error("--output is required for parquet")
+    if not Path(args.db).exists():
+        sys.exit(f"No notes database at {args.db}")
+
+    # Read-only, so exporting never blocks the app's writer.
+    conn = sqlite3.connect(f"file:{args.db}?mode=ro", uri=True)
+    batches = iter_notes(
+        conn,
+        prefixes=args.prefix,
+        since=_timestamp(args.since) if args.since else None,
+        until=_timestamp(args.until) if args.until else None,
+        classroom=args.classroom,
+    )
+    try:
+        if args.format == "parquet":
+            count = write_parquet(batches, Path(args.output))
+        else:
+            writer = write_csv if args.format == "csv" else write_jsonl
+            if args.output:
+                with open(args.output, "w", encoding="utf-8", newline="") as out:
+                    count = writer(batches, out)
+            else:
+                count = writer(batches, sys.stdout)
+    finally:
+        conn.close()
+    print(f"Exported {count} notes.", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
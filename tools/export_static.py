@@ -0,0 +1,166 @@
+"""
+Static offline export of every experiment.
+
+Writes a self-contained folder that any browser can open straight from a
+USB stick or a plain file server, with no Python running:
+
+    index.html, *.css, blocks.js, lab.js     the page (from lab/web)
+    data.js                                  texts, widgets and every result
+    assets/                                  step images and GIFs
+    frames/                                  simulated images, named by content
+
+Every simulation is run once for every combination of its inputs, so each
+slider position and choice is a lookup in the browser.
+
+    python -m tools.export_static [-o dist/offline] [--quality standard]
+"""
+import argparse
+import itertools
+import json
+import shutil
+import time
+from pathlib import Path
+
+import numpy as np
+
+from lab.asset_variants import DEFAULT_QUALITY, QUALITY_LEVELS, pick_variant
+from lab.experiments import (
+    ASSET_COLUMN_WIDTH,
+    find_widget,
+    json_blocks,
+    load_registry,
+    run_simulation,
+    widget_choices,
+    widget_default,
+)
+from lab.frames import encode_frame, frame_digest
+
+TEMPLATE_DIR = Path(__file__).resolve().parent.parent / "lab" / "web"
+TEMPLATE_FILES = ("index.html", "blocks.css", "lab.css", "blocks.js", "lab.js")
+DEFAULT_OUTPUT_DIR = Path("dist/offline")
+
+# Widget settings the page needs; the rest are Streamlit-only.
+WIDGET_FIELDS = ("kind", "key", "label", "options", "min_value", "max_value", "step", "max_selections")
+
+
+def view_key(values: list) -> str:
+    """
+    Lookup key for a set of input values; matches viewKey() in blocks.js.
+    """
+    return json.dumps(values, separators=(",", ":"), ensure_ascii=False)
+
+
+class FrameWriter:
+    """
+    Writes simulated images as WebP named by content, so a frame shared by
+    several steps or inputs is stored once.
+    """
+
+    def __init__(self, out_dir: Path):
+        self.out_dir = out_dir
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        self.written: dict[str, str] = {}
+        self.bytes = 0
+
+    def write(self, image: np.ndarray) -> str:
+        digest = frame_digest(image)
+        if digest not in self.written:
+            data = encode_frame(image)
+            path = self.out_dir / f"{digest}.webp"
+            path.write_bytes(data)
+            self.bytes += len(data)
+            self.written[digest] = f"{self.out_dir.name}/{path.name}"
+        return self.written[digest]
+
+
+def export_asset(path: str, out_dir: Path, quality: str) -> str | None:
+    """
+    Copy the built variant the app would send for a step asset, or the
+    original if there is no build. Returns its path in the bundle.
+    """
+    variant = pick_variant(path, ASSET_COLUMN_WIDTH, quality)
+    source = Path(variant["path"]) if variant else Path(path)
+    if not source.exists():
+        return None
+    target = out_dir / source.name
+    if variant:
+        # Variants are named by quality and width; keep the asset's own name.
+        target = out_dir / f"{Path(path).stem}-{source.name}"
+    target.parent.mkdir(parents=True, exist_ok=True)
+    shutil.copyfile(source, target)
+    return f"{out_dir.name}/{target.name}"
+
+
+def export_step(experiment: dict, step: dict, frames: FrameWriter, assets_dir: Path, quality: str) -> dict:
+    widgets = []
+    for widget in step.get("widgets", []):
+        exported = {field: widget[field] for field in WIDGET_FIELDS if field in widget}
+        exported["default"] = widget_default(widget)
+        widgets.append(exported)
+
+    views = {}
+    inputs = step.get("inputs", [])
+    if "simulation" in step:
+        choices = [widget_choices(find_widget(key)) for key in inputs]
+        for combination in itertools.product(*choices):
+            blocks = run_simulation(experiment, step, dict(zip(inputs, combination)))
+            views[view_key(list(combination))] = json_blocks(blocks, frames.write)
+
+    return {
+        "label": step["label"],
+        "title": step["title"],
+        "body": step["body"],
+        "asset": export_asset(step["asset"], assets_dir, quality),
+        "caption": step["caption"],
+        "widgets": widgets,
+        "inputs": inputs,
+        "views": views,
+    }
+
+
+def export_experiment(experiment: dict, frames: FrameWriter, assets_dir: Path, quality: str) -> dict:
+    fields = ("id", "title", "subtitle", "materials", "materials_note", "reflection")
+    exported = {field: experiment[field] for field in fields}
+    exported["steps"] = [export_step(experiment, step, frames, assets_dir, quality) for step in experiment["step"]]
+    return exported
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("-o", "--output", type=Path, default=DEFAULT_OUTPUT_DIR, help=f"output folder (default {DEFAULT_OUTPUT_DIR})")
+    parser.add_argument(
+        "--quality", choices=list(QUALITY_LEVELS), default=DEFAULT_QUALITY, help="which built asset variants to include"
+    )
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    out = args.output
+    # Frames and assets are regenerated in full; nothing else in the folder is touched.
+    for folder in ("frames", "assets"):
+        shutil.rmtree(out / folder, ignore_errors=True)
+    out.mkdir(parents=True, exist_ok=True)
+    frames = FrameWriter(out / "frames")
+
+    experiments = []
+    for experiment in load_registry():
+        experiments.append(export_experiment(experiment, frames, out / "assets", args.quality))
+        views = sum(len(step["views"]) for step in experiments[-1]["steps"])
+        print(f"{experiment['id']}: {views} results")
+
+    data = {"experiments": experiments}
+    # A script rather than JSON, so the page works from file:// where fetch() is blocked.
+    (out / "data.js").write_text(
+        "window.LAB_DATA = " + json.dumps(data, ensure_ascii=False, separators=(",", ":")) + ";\n", encoding="utf-8"
+    )
+    for name in TEMPLATE_FILES:
+        shutil.copyfile(TEMPLATE_DIR / name, out / name)
+
+    total = sum(f.stat().st_size for f in out.rglob("*") if f.is_file())
+    print(
+        f"Wrote {out} in {time.perf_counter() - start:.1f}s: {len(frames.written)} frames "
+        f"({frames.bytes / 2**20:.1f} MB), {total / 2**20:.1f} MB in all"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,352 @@
+"""
+Optimise and check the experiment assets teachers drop into assets/.
+
+Scans every exp0* file in assets/images and assets/gif, in parallel, and
+rewrites the ones over budget in place:
+
+    stills   shrunk to fit MAX_DIMENSION, metadata stripped, re-encoded;
+             PNGs over the byte budget are palette-quantised
+    GIFs     shrunk to fit GIF_MAX_DIMENSION, frames dropped down to
+             GIF_MAX_FRAMES (keeping the running time), palette-quantised
+
+The first time a file is rewritten, the teacher's original is kept under
+assets/originals. Every asset the registry expects but cannot find is
+reported too.
+
+    python -m tools.optimise_assets [--check] [--watch] [--jobs N]
+
+--check only reports, and exits non-zero if an asset is missing or over
+budget. --watch keeps running and optimises files as they are dropped in.
+Run tools.build_assets afterwards to rebuild the variants.
+"""
+import argparse
+import io
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from PIL import Image, ImageOps, ImageSequence
+
+from lab.asset_variants import BUILD_DIR, SOURCE_DIRS, SOURCE_PATTERNS
+from lab.experiments import load_registry
+from lab.files import atomic_write, file_signature
+
+ORIGINALS_DIR = Path("assets/originals")
+# What each file looked like after its last check, so unchanged files are skipped.
+STATE_PATH = BUILD_DIR / "optimised.json"
+
+MAX_DIMENSION = 1600
+STILL_BUDGET_BYTES = 600 * 1024
+JPEG_QUALITIES = (85, 78, 70, 62)
+
+GIF_MAX_DIMENSION = 640
+GIF_MAX_FRAMES = 48
+GIF_COLOURS = 128
+GIF_BUDGET_BYTES = 2 * 1024 * 1024
+
+# Image info that affects how a file looks or plays; anything else is metadata.
+KEEP_INFO = {
+    "icc_profile", "transparency", "duration", "loop", "background", "version", "extension",
+    "gamma", "dpi", "aspect", "progressive", "progression", "interlace",
+    "jfif", "jfif_version", "jfif_unit", "jfif_density", "adobe", "adobe_transform",
+}
+
+
+def expected_assets() -> list[str]:
+    """
+    Asset paths the registry refers to, in registry order.
+    """
+    return [step["asset"] for experiment in load_registry() for step in experiment["step"] if step.get("asset")]
+
+
+def find_assets() -> list[Path]:
+    """
+    Every exp0* file in the asset folders, including types the app cannot
+    show, so they can be reported.
+    """
+    found = set()
+    for folder in SOURCE_DIRS:
+        found.update(p for p in Path(folder).glob("exp0*") if p.is_file())
+    return sorted(found)
+
+
+def _supported(path: Path) -> bool:
+    return any(path.match(pattern) for pattern in SOURCE_PATTERNS)
+
+
+def _metadata(img: Image.Image) -> list[str]:
+    return sorted(key for key in img.info if key not in KEEP_INFO)
+
+
+def _fit(img: Image.Image, limit: int) -> Image.Image:
+    if max(img.size) <= limit:
+        return img
+    scale = limit / max(img.size)
+    size = (max(1, round(img.width * scale)), max(1, round(img.height * scale)))
+    return img.resize(size, Image.LANCZOS)
+
+
+def _has_alpha(img: Image.Image) -> bool:
+    return img.mode in ("RGBA", "LA", "PA") or "transparency" in img.info
+
+
+def _quantise(img: Image.Image, colours: int = 256) -> Image.Image:
+    method = Image.Quantize.FASTOCTREE if _has_alpha(img) else Image.Quantize.MEDIANCUT
+    return img.convert("RGBA" if _has_alpha(img) else "RGB").quantize(colors=colours, method=method)
+
+
+def _encode_still(img: Image.Image, fmt: str, icc_profile: bytes | None, palette_colours: int | None) -> bytes:
+    """
+    Encode without metadata other than the colour profile, stepping down
+    JPEG quality or quantising a PNG until it fits the budget or there is
+    nothing left to try. A PNG that was a palette image goes back to a
+    palette of `palette_colours`.
+    """
+    buffer = io.BytesIO()
+    if fmt == "JPEG":
+        img = img.convert("RGB")
+        for quality in JPEG_QUALITIES:
+            buffer = io.BytesIO()
+            img.save(buffer, "JPEG", quality=quality, optimize=True, progressive=True, icc_profile=icc_profile)
+            if buffer.tell() <= STILL_BUDGET_BYTES:
+                break
+        return buffer.getvalue()
+
+    if palette_colours and img.mode != "P":
+        img = _quantise(img, palette_colours)
+    img.save(buffer, "PNG", optimize=True, icc_profile=icc_profile)
+    if buffer.tell() > STILL_BUDGET_BYTES and img.mode != "P":
+        buffer = io.BytesIO()
+        _quantise(img).save(buffer, "PNG", optimize=True, icc_profile=icc_profile)
+    return buffer.getvalue()
+
+
+def _encode_gif(img: Image.Image) -> tuple[bytes, int]:
+    """
+    Shrink, decimate and palette-quantise an animation. Dropped frames'
+    durations are added to the frame kept before them, so it plays for as
+    long as before. Returns the file and its frame count.
+    """
+    frames, durations = [], []
+    for frame in ImageSequence.Iterator(img):
+        frames.append(frame.convert("RGB"))
+        durations.append(frame.info.get("duration", 100))
+    step = -(-len(frames) // GIF_MAX_FRAMES)
+    kept = [
+        (_fit(frames[i], GIF_MAX_DIMENSION), sum(durations[i : i + step])) for i in range(0, len(frames), step)
+    ]
+    palette = [f.quantize(colors=GIF_COLOURS, method=Image.Quantize.MEDIANCUT) for f, _ in kept]
+    buffer = io.BytesIO()
+    palette[0].save(
+        buffer,
+        "GIF",
+        save_all=True,
+        append_images=palette[1:],
+        duration=[d for _, d in kept],
+        loop=img.info.get("loop", 0),
+        optimize=True,
+    )
+    return buffer.getvalue(), len(kept)
+
+
+def optimise_one(path: str, check_only: bool, ours: bool = False) -> dict:
+    """
+    Check one asset against the budgets and, unless `check_only`, rewrite
+    it if that helps. `ours` says the file is this tool's own output, so it
+    is not kept as the original. Runs in a worker process; returns a report
+    row.
+    """
+    source = Path(path)
+    try:
+        before = source.stat().st_size
+    except OSError as error:
+        # Removed or renamed since the scan.
+        return {"path": path, "before": 0, "after": 0, "changes": [], "problems": [f"cannot be read: {error}"]}
+    row = {"path": path, "before": before, "after": before, "changes": [], "problems": []}
+    if not _supported(source):
+        row["problems"].append(f"unsupported type; use one of {', '.join(SOURCE_PATTERNS)}")
+        return row
+    try:
+        with Image.open(source) as img:
+            img.load()
+            fmt = img.format
+            animated = getattr(img, "is_animated", False)
+            frames = getattr(img, "n_frames", 1)
+            metadata = _metadata(img)
+            if fmt == "GIF":
+                limit, budget = GIF_MAX_DIMENSION, GIF_BUDGET_BYTES
+            else:
+                limit, budget = MAX_DIMENSION, STILL_BUDGET_BYTES
+            over_size = max(img.size) > limit
+            over_frames = animated and frames > GIF_MAX_FRAMES
+            if over_size:
+                row["problems"].append(f"{img.width}x{img.height} px, over {limit} px")
+            if over_frames:
+                row["problems"].append(f"{frames} frames, over {GIF_MAX_FRAMES}")
+            if before > budget:
+                row["problems"].append(f"{before / 1024:.0f} KiB, over {budget / 1024:.0f} KiB")
+            if metadata:
+                row["problems"].append(f"metadata: {', '.join(metadata)}")
+            if check_only or not row["problems"]:
+                return row
+
+            if fmt == "GIF":
+                data, kept = _encode_gif(img)
+                if kept != frames:
+                    row["changes"].append(f"{frames} -> {kept} frames")
+            else:
+                upright = ImageOps.exif_transpose(img)
+                palette_colours = None
+                if img.mode == "P":
+                    # Resized in full colour, as Pillow resizes palette images
+                    # by nearest neighbour, then brought back to as many
+                    # colours as before, so smoothed edges add no new ones.
+                    palette_colours = len(img.getcolors(256) or range(256))
+                    upright = upright.convert("RGBA" if _has_alpha(img) else "RGB")
+                fitted = _fit(upright, limit)
+                data = _encode_still(
+                    fitted, "JPEG" if fmt == "JPEG" else "PNG", img.info.get("icc_profile"), palette_colours
+                )
+            if over_size:
+                row["changes"].append(f"resized from {img.width}x{img.height}")
+            if metadata:
+                row["changes"].append("metadata stripped")
+    except (OSError, Image.DecompressionBombError) as error:
+        # DecompressionBombError is Pillow's refusal of images over ~179 MP.
+        row["problems"] = [f"cannot be read as an image: {error}"]
+        return row
+
+    # A re-encode that is no smaller only helps if it fixed the size or frames.
+    if len(data) >= before and not (over_size or over_frames):
+        row["problems"].append("could not be made smaller")
+        return row
+
+    if not ours:
+        atomic_write(ORIGINALS_DIR / source.relative_to("assets"), source.read_bytes())
+    atomic_write(source, data)
+
+    row["after"] = len(data)
+    # An earlier output of this tool is replaced; its original is already
+    # in ORIGINALS_DIR from the first pass.
+    row["changes"].insert(0, "optimised" if ours else "optimised, original kept")
+    row["problems"] = []
+    if len(data) > budget:
+        row["problems"].append(f"still {len(data) / 1024:.0f} KiB, over {budget / 1024:.0f} KiB")
+    return row
+
+
+def load_state() -> dict:
+    try:
+        return json.loads(STATE_PATH.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def write_state(state: dict):
+    atomic_write(STATE_PATH, json.dumps(state, indent=2, sort_keys=True))
+
+
+def changed_assets(state: dict) -> list[Path]:
+    """
+    Assets that are new or have changed since they were last optimised.
+    """
+    return [path for path in find_assets() if state.get(path.as_posix()) != file_signature(path)]
+
+
+def optimise(pool: ProcessPoolExecutor, paths: list[Path], state: dict, check_only: bool) -> list[dict]:
+    """
+    Optimise (or check) `paths` in parallel and return the report rows.
+    Unless checking, each file's state is recorded, so it is only looked at
+    again once it changes.
+    """
+    ours = [state.get(p.as_posix()) == file_signature(p) for p in paths]
+    rows = list(pool.map(optimise_one, [p.as_posix() for p in paths], [check_only] * len(paths), ours))
+    if not check_only:
+        for row in rows:
+            signature = file_signature(Path(row["path"]))
+            if signature is None:
+                state.pop(row["path"], None)
+            else:
+                state[row["path"]] = signature
+    return rows
+
+
+def print_rows(rows: list[dict]):
+    for row in rows:
+        size = f"{row['before'] / 1024:.0f} KiB"
+        if row["after"] != row["before"]:
+            size += f" -> {row['after'] / 1024:.0f} KiB"
+        notes = row["changes"] + [f"PROBLEM {p}" for p in row["problems"]]
+        print(f"{row['path']}: {size}" + (f" ({'; '.join(notes)})" if notes else ""))
+
+
+def watch_once(pool: ProcessPoolExecutor, state: dict, seen_sizes: dict[str, int]):
+    """
+    One scan in watch mode. A file is only optimised once its size holds
+    still between two scans, so a copy still in progress is left alone.
+    """
+    ready = []
+    for path in changed_assets(state):
+        try:
+            size = path.stat().st_size
+        except OSError:
+            continue
+        if seen_sizes.get(path.as_posix()) == size:
+            ready.append(path)
+        seen_sizes[path.as_posix()] = size
+    if ready:
+        for path in ready:
+            seen_sizes.pop(path.as_posix(), None)
+        print_rows(optimise(pool, ready, state, False))
+        write_state(state)
+
+
+def missing_assets() -> list[str]:
+    return [path for path in expected_assets() if not Path(path).is_file()]
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--check", action="store_true", help="report only; exit non-zero on missing or over-budget assets")
+    parser.add_argument("--watch", action="store_true", help="keep running and optimise new or changed files")
+    parser.add_argument("--interval", type=float, default=2.0, help="seconds between scans in watch mode")
+    parser.add_argument("--force", action="store_true", help="look at every file, not just changed ones")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count(), help="worker processes (default: one per CPU)")
+    args = parser.parse_args(argv)
+
+    state = {} if args.check else load_state()
+    with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+        paths = find_assets() if args.check or args.force else changed_assets(state)
+        rows = optimise(pool, paths, state, args.check)
+        print_rows(rows)
+        missing = missing_assets()
+        for path in missing:
+            print(f"MISSING {path}")
+        print(f"Checked {len(rows)} file(s); {len(missing)} expected asset(s) missing.")
+        if args.check:
+            if missing or any(row["problems"] for row in rows):
+                sys.exit(1)
+            return
+        write_state(state)
+        if not args.watch:
+            return
+
+        print(f"Watching {', '.join(SOURCE_DIRS)}; press Ctrl+C to stop.")
+        seen_sizes: dict[str, int] = {}
+        try:
+            while True:
+                time.sleep(args.interval)
+                try:
+                    watch_once(pool, state, seen_sizes)
+                except Exception as error:
+                    # One bad file or a passing disk error must not stop the watcher.
+                    print(f"PROBLEM while watching: {error!r}", file=sys.stderr)
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
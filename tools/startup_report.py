@@ -0,0 +1,160 @@
+"""
+Cold start report for the lab app.
+
+Starts fresh Python processes, as a newly scheduled container would, and
+in each one measures:
+
+    streamlit   importing Streamlit itself
+    app         importing the lab modules app.py uses
+    first run   the first run of app.py, through AppTest, to the first page
+    warm run    a second run in the same process
+
+It prints the median of each over the runs, and the slowest imports as
+reported by python -X importtime. It also checks that the heavy modules in
+the budget's "lazy_modules" are not loaded before the first page is shown.
+
+    python -m tools.startup_report [--runs N] [--top N]
+
+Exits non-zero if a median is over its budget in tools/startup_budget.json
+or a lazy module was loaded. Budgets depend on the machine; set them from a
+few runs on the machine that runs the check.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+APP_PATH = ROOT / "app.py"
+BUDGET_PATH = Path(__file__).with_name("startup_budget.json")
+DEFAULT_RUNS = 3
+PHASES = ("streamlit", "app", "first run", "warm run")
+
+# Runs in the fresh process. AppTest spends a few hundred ms setting up each
+# run whatever the script, so app.py is timed from inside the run instead.
+CHILD = """
+import json, sys, time
+t0 = time.perf_counter()
+import streamlit
+t1 = time.perf_counter()
+import lab.ui
+t2 = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_string(f'''
+import time
+import streamlit as st
+start = time.perf_counter()
+exec(compile(open({sys.argv[1]!r}).read(), {sys.argv[1]!r}, "exec"), {{"__name__": "__main__"}})
+st.session_state["run_seconds"] = time.perf_counter() - start
+''', default_timeout=60)
+at.run()
+first = at.session_state["run_seconds"]
+loaded = sorted(name for name in sys.argv[2:] if name in sys.modules)
+at.run()
+if at.exception:
+    raise SystemExit(f"app.py raised: {at.exception[0].message}")
+print(json.dumps({
+    "streamlit": t1 - t0, "app": t2 - t1, "first run": first, "warm run": at.session_state["run_seconds"],
+    "loaded": loaded,
+}))
+"""
+
+
+def measure_once(lazy_modules: list[str]) -> tuple[dict, list[tuple[float, str]]]:
+    """
+    One cold start in a fresh process. Returns the phase times in seconds,
+    with the lazy modules it loaded, and (cumulative seconds, module) for
+    every top-level import.
+    """
+    env = {
+        **os.environ,
+        # Prefetching starts after the page is drawn and loads NumPy in the
+        # background; leave it out so the check sees what the page needs.
+        "LAB_PREFETCH_WORKERS": "0",
+        "LAB_METRICS_FILE": "",
+    }
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", CHILD, str(APP_PATH), *lazy_modules],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise SystemExit(result.stderr.strip().splitlines()[-1])
+    imports = []
+    for line in result.stderr.splitlines():
+        # "import time: self [us] | cumulative | imported package", nested
+        # imports indented under the one that pulled them in.
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        top_level = not name[1:].startswith(" ")
+        if cumulative.strip().isdigit() and top_level and not name.strip().startswith("streamlit.testing"):
+            imports.append((int(cumulative) / 1e6, name.strip()))
+    return json.loads(result.stdout.strip().splitlines()[-1]), imports
+
+
+def measure(runs: int, lazy_modules: list[str]) -> tuple[dict, list[tuple[float, str]]]:
+    """
+    Median phase times in ms over `runs` cold starts, the lazy modules any
+    of them loaded, and the slowest top-level imports of the last one.
+    """
+    times = {phase: [] for phase in PHASES}
+    loaded = set()
+    for _ in range(runs):
+        result, imports = measure_once(lazy_modules)
+        for phase in PHASES:
+            times[phase].append(result[phase] * 1000)
+        loaded.update(result["loaded"])
+    summary = {phase: round(statistics.median(values), 1) for phase, values in times.items()}
+    summary["total"] = round(sum(summary[phase] for phase in PHASES[:3]), 1)
+    summary["loaded"] = sorted(loaded)
+    return summary, sorted(imports, reverse=True)
+
+
+def check(summary: dict, budget: dict) -> list[str]:
+    problems = []
+    for phase, limit in budget["ms"].items():
+        if summary[phase] > limit:
+            problems.append(f"{phase}: {summary[phase]:.0f} ms, over the budget of {limit:.0f} ms")
+    for name in summary["loaded"]:
+        problems.append(f"{name} was imported before the first page was shown")
+    return problems
+
+
+def print_report(summary: dict, budget: dict, imports: list[tuple[float, str]], top: int):
+    print(f"{'phase':12}{'median ms':>10}{'budget':>8}")
+    for phase in (*PHASES, "total"):
+        limit = budget["ms"].get(phase)
+        print(f"{phase:12}{summary[phase]:10.1f}{'' if limit is None else f'{limit:8.0f}'}")
+    print("\nSlowest imports (cumulative ms, last run):")
+    for seconds, name in imports[:top]:
+        print(f"{seconds * 1000:10.1f}  {name}")
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=DEFAULT_RUNS, help="cold starts to take the median of")
+    parser.add_argument("--top", type=int, default=10, help="slowest imports to list")
+    parser.add_argument("--budget", type=Path, default=BUDGET_PATH, help="budget file to check against")
+    args = parser.parse_args(argv)
+
+    budget = json.loads(args.budget.read_text(encoding="utf-8"))
+    summary, imports = measure(args.runs, budget["lazy_modules"])
+    print_report(summary, budget, imports, args.top)
+
+    problems = check(summary, budget)
+    if problems:
+        print("\nOver budget:")
+        for problem in problems:
+            print(f"  {problem}")
+        sys.exit(1)
+    print("\nWithin the startup budget.")
+
+
+if __name__ == "__main__":
+    main()